@@ -0,0 +1,50 @@
+"""user sessions
+
+Revision ID: 3f1c9a7d2b64
+Revises: 749e26d37930
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = '749e26d37930'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('usersessions',
+    sa.Column('jti', sa.String(length=64), nullable=False, comment='ID refresh токена'),
+    sa.Column('user_id', sa.BigInteger(), nullable=False, comment='ID пользователя'),
+    sa.Column('role', sa.String(length=20), nullable=False, comment='Роль пользователя'),
+    sa.Column('ip', sa.String(length=255), nullable=False, comment='IP адрес'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Дата создания'),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False, comment='Время истечения'),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('jti')
+    )
+    op.create_index(op.f('ix_usersessions_user_id'), 'usersessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_usersessions_expires_at'), 'usersessions', ['expires_at'], unique=False)
+    op.drop_column('students', 'refresh_id')
+    op.drop_column('students', 'ip')
+    op.drop_column('teachers', 'refresh_id')
+    op.drop_column('teachers', 'ip')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('teachers', sa.Column('ip', sa.String(length=255), nullable=True, comment='IP адрес'))
+    op.add_column('teachers', sa.Column('refresh_id', sa.String(length=255), nullable=True, comment='ID refresh токена'))
+    op.add_column('students', sa.Column('ip', sa.String(length=255), nullable=True, comment='IP адрес'))
+    op.add_column('students', sa.Column('refresh_id', sa.String(length=255), nullable=True, comment='ID refresh токена'))
+    op.drop_index(op.f('ix_usersessions_expires_at'), table_name='usersessions')
+    op.drop_index(op.f('ix_usersessions_user_id'), table_name='usersessions')
+    op.drop_table('usersessions')
@@ -0,0 +1,50 @@
+"""feed full-text search
+
+Revision ID: 5d0b8f3e6c17
+Revises: e4a9c2f71b30
+Create Date: 2026-10-17 15:31:09.227451
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0b8f3e6c17'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c2f71b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('applicationfeeds', sa.Column('description', sa.String(length=200), nullable=True, comment='Описание'))
+    op.execute(
+        "UPDATE applicationfeeds f SET description = a.description "
+        "FROM applications a WHERE a.id = f.id"
+    )
+    op.alter_column('applicationfeeds', 'description', nullable=False)
+    op.add_column('applicationfeeds', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('russian', description)", persisted=True),
+        comment='Поисковый вектор описания'
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_applicationfeeds_search_vector', 'applicationfeeds', ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_applicationfeeds_search_vector', table_name='applicationfeeds', postgresql_using='gin')
+    op.drop_column('applicationfeeds', 'search_vector')
+    op.drop_column('applicationfeeds', 'description')
@@ -0,0 +1,58 @@
+"""hot path indexes
+
+Revision ID: 8c2e5f0a1d93
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-17 11:04:27.541930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e5f0a1d93'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя индекса, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    ('ix_applications_status_price_created_at', 'applications',
+     ['status', sa.text('price DESC'), sa.text('created_at DESC')], None),
+    ('ix_applications_student_id_created_at', 'applications',
+     ['student_id', sa.text('created_at DESC')], None),
+    ('ix_applications_subject_id_status', 'applications', ['subject_id', 'status'], None),
+    ('ix_matchs_teacher_id_updated_at', 'matchs', ['teacher_id', sa.text('updated_at DESC')], None),
+    ('ix_matchs_student_id_updated_at', 'matchs', ['student_id', sa.text('updated_at DESC')], None),
+    ('ix_matchs_application_id_teacher_id', 'matchs', ['application_id', 'teacher_id'], None),
+    ('ix_reviews_teacher_id_created_at', 'reviews', ['teacher_id', sa.text('created_at DESC')], None),
+    ('ix_reviews_student_id_teacher_id', 'reviews', ['student_id', 'teacher_id'], None),
+    ('ix_tokens_value', 'tokens', ['value'], None),
+    ('ix_teacher_subjects_subject_id', 'teacher_subjects', ['subject_id', 'teacher_id'], None),
+    ('ix_hidden_applications_application_id', 'hidden_applications', ['application_id'], None),
+    ('ix_teachers_rating_active', 'teachers', [sa.text('rating DESC')],
+     sa.text('active IS true AND is_deleted IS false')),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
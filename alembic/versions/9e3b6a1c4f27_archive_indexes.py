@@ -0,0 +1,51 @@
+"""archive indexes
+
+Revision ID: 9e3b6a1c4f27
+Revises: 5d0b8f3e6c17
+Create Date: 2026-10-17 16:05:12.418337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b6a1c4f27'
+down_revision: Union[str, Sequence[str], None] = '5d0b8f3e6c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Частичные индексы для поиска устаревших заявок и откликов архиватором
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_applications_created_at_active', 'applications', ['created_at'],
+            unique=False,
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_matchs_created_at_request', 'matchs', ['created_at'],
+            unique=False,
+            postgresql_where=sa.text("status = 'REQUEST'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_matchs_created_at_request', table_name='matchs',
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            'ix_applications_created_at_active', table_name='applications',
+            postgresql_concurrently=True, if_exists=True,
+        )
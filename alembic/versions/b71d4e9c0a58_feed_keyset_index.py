@@ -0,0 +1,51 @@
+"""feed keyset index
+
+Revision ID: b71d4e9c0a58
+Revises: 8c2e5f0a1d93
+Create Date: 2026-10-17 13:22:48.103624
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d4e9c0a58'
+down_revision: Union[str, Sequence[str], None] = '8c2e5f0a1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индекс ленты дополняется id для пагинации по ключу (price, created_at, id)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_applications_status_price_created_at_id', 'applications',
+            ['status', sa.text('price DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_applications_status_price_created_at', table_name='applications',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_applications_status_price_created_at', 'applications',
+            ['status', sa.text('price DESC'), sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_applications_status_price_created_at_id', table_name='applications',
+            postgresql_concurrently=True, if_exists=True,
+        )
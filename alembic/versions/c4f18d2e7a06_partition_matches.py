@@ -0,0 +1,80 @@
+"""partition matches by status
+
+Revision ID: c4f18d2e7a06
+Revises: 9e3b6a1c4f27
+Create Date: 2026-10-17 16:48:37.905164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f18d2e7a06'
+down_revision: Union[str, Sequence[str], None] = '9e3b6a1c4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Индексы таблицы откликов (создаются на родительской таблице и наследуются секциями)
+INDEXES = [
+    "CREATE INDEX ix_matchs_teacher_id_updated_at ON matchs (teacher_id, updated_at DESC)",
+    "CREATE INDEX ix_matchs_student_id_updated_at ON matchs (student_id, updated_at DESC)",
+    "CREATE INDEX ix_matchs_application_id_teacher_id ON matchs (application_id, teacher_id)",
+    "CREATE INDEX ix_matchs_created_at_request ON matchs (created_at) WHERE status = 'REQUEST'",
+]
+
+FOREIGN_KEYS = [
+    "ALTER TABLE matchs ADD CONSTRAINT matchs_student_id_fkey "
+    "FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE NO ACTION",
+    "ALTER TABLE matchs ADD CONSTRAINT matchs_teacher_id_fkey "
+    "FOREIGN KEY (teacher_id) REFERENCES teachers (id) ON DELETE NO ACTION",
+    "ALTER TABLE matchs ADD CONSTRAINT matchs_application_id_fkey "
+    "FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE NO ACTION",
+]
+
+
+def _detach_old_table() -> None:
+    """Переименование текущей таблицы откликов в matchs_old"""
+    op.execute("ALTER TABLE matchs RENAME TO matchs_old")
+    op.execute("ALTER TABLE matchs_old RENAME CONSTRAINT matchs_pkey TO matchs_old_pkey")
+    for name in ("student_id", "teacher_id", "application_id"):
+        op.execute(f"ALTER TABLE matchs_old DROP CONSTRAINT IF EXISTS matchs_{name}_fkey")
+    op.execute("DROP INDEX IF EXISTS ix_matchs_teacher_id_updated_at")
+    op.execute("DROP INDEX IF EXISTS ix_matchs_student_id_updated_at")
+    op.execute("DROP INDEX IF EXISTS ix_matchs_application_id_teacher_id")
+    op.execute("DROP INDEX IF EXISTS ix_matchs_created_at_request")
+    # Последовательность id переходит к новой таблице
+    op.execute("ALTER SEQUENCE matchs_id_seq OWNED BY NONE")
+
+
+def _finish_new_table() -> None:
+    """Перенос данных, удаление matchs_old, ключи и индексы новой таблицы"""
+    op.execute("INSERT INTO matchs SELECT * FROM matchs_old")
+    op.execute("DROP TABLE matchs_old")
+    op.execute("ALTER SEQUENCE matchs_id_seq OWNED BY matchs.id")
+    for statement in FOREIGN_KEYS + INDEXES:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Открытые отклики (REQUEST, ACTIVE) отделяются от растущего архива.
+    # Таблица блокируется на время переноса данных.
+    _detach_old_table()
+    op.execute(
+        "CREATE TABLE matchs (LIKE matchs_old INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        "PARTITION BY LIST (status)"
+    )
+    op.execute("ALTER TABLE matchs ADD CONSTRAINT matchs_pkey PRIMARY KEY (id, status)")
+    op.execute("CREATE TABLE matchs_open PARTITION OF matchs FOR VALUES IN ('REQUEST', 'ACTIVE')")
+    op.execute("CREATE TABLE matchs_closed PARTITION OF matchs FOR VALUES IN ('ARCHIVED', 'REJECTED')")
+    _finish_new_table()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _detach_old_table()
+    op.execute("CREATE TABLE matchs (LIKE matchs_old INCLUDING DEFAULTS INCLUDING COMMENTS)")
+    op.execute("ALTER TABLE matchs ADD CONSTRAINT matchs_pkey PRIMARY KEY (id)")
+    _finish_new_table()
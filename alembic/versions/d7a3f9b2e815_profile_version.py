@@ -0,0 +1,35 @@
+"""profile version
+
+Revision ID: d7a3f9b2e815
+Revises: c4f18d2e7a06
+Create Date: 2026-10-17 19:42:08.205114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f9b2e815'
+down_revision: Union[str, Sequence[str], None] = 'c4f18d2e7a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('students', 'teachers'):
+        op.add_column(table, sa.Column(
+            'profile_version', sa.Integer(), server_default='0', nullable=False,
+            comment='Версия профиля (увеличение отзывает выданные access токены)'
+        ))
+        # Токены удаленных пользователей, выданные до миграции (версия 0), недействительны
+        op.execute(f"UPDATE {table} SET profile_version = 1 WHERE is_deleted")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('teachers', 'students'):
+        op.drop_column(table, 'profile_version')
@@ -0,0 +1,59 @@
+"""application feed
+
+Revision ID: e4a9c2f71b30
+Revises: b71d4e9c0a58
+Create Date: 2026-10-17 14:05:12.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2f71b30'
+down_revision: Union[str, Sequence[str], None] = 'b71d4e9c0a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('applicationfeeds',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False, comment='ID заявки'),
+    sa.Column('subject_id', sa.Integer(), nullable=False, comment='ID предмета'),
+    sa.Column('subject_name', sa.String(length=50), nullable=False, comment='Название предмета'),
+    sa.Column('price', sa.Integer(), nullable=False, comment='Цена за час'),
+    sa.Column('lessons_count', sa.Enum('FEW', 'MEDIUM', 'MANY', name='lessonscount', native_enum=False), nullable=False, comment='Предполагаемое количество уроков'),
+    sa.Column('student_id', sa.BigInteger(), nullable=False, comment='ID ученика'),
+    sa.Column('student_age', sa.Integer(), nullable=True, comment='Возраст ученика'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Дата создания'),
+    sa.ForeignKeyConstraint(['id'], ['applications.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_applicationfeeds_price_created_at_id', 'applicationfeeds',
+                    [sa.text('price DESC'), sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_applicationfeeds_subject_name_price_created_at_id', 'applicationfeeds',
+                    ['subject_name', sa.text('price DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+                    unique=False)
+    op.create_index('ix_applicationfeeds_student_id', 'applicationfeeds', ['student_id'], unique=False)
+
+    # Заполнение ленты активными заявками
+    op.execute(
+        "INSERT INTO applicationfeeds "
+        "(id, subject_id, subject_name, price, lessons_count, student_id, student_age, created_at) "
+        "SELECT a.id, a.subject_id, s.name, a.price, a.lessons_count, a.student_id, st.age, a.created_at "
+        "FROM applications a "
+        "JOIN subjects s ON s.id = a.subject_id "
+        "JOIN students st ON st.id = a.student_id "
+        "WHERE a.status = 'ACTIVE'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_applicationfeeds_student_id', table_name='applicationfeeds')
+    op.drop_index('ix_applicationfeeds_subject_name_price_created_at_id', table_name='applicationfeeds')
+    op.drop_index('ix_applicationfeeds_price_created_at_id', table_name='applicationfeeds')
+    op.drop_table('applicationfeeds')
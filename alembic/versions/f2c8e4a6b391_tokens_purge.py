@@ -0,0 +1,44 @@
+"""tokens purge
+
+Revision ID: f2c8e4a6b391
+Revises: d7a3f9b2e815
+Create Date: 2026-10-17 21:14:37.520961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8e4a6b391'
+down_revision: Union[str, Sequence[str], None] = 'd7a3f9b2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Использованные токены удаляются, флаг больше не нужен
+    op.drop_column('tokens', 'used')
+    # Индекс для периодического удаления истекших токенов
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tokens_expires_at', 'tokens', ['expires_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tokens_expires_at', table_name='tokens',
+            postgresql_concurrently=True, if_exists=True,
+        )
+    op.add_column('tokens', sa.Column(
+        'used', sa.Boolean(), server_default=sa.false(), nullable=False, comment='Использован'
+    ))
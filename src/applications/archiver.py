@@ -0,0 +1,172 @@
+"""Архивация устаревших заявок и откликов
+
+Фоновая задача периодически:
+- переводит активные заявки старше APPLICATION_MAX_AGE_DAYS в ARCHIVED
+  (удаляет их из ленты и отклоняет их отклики в статусе REQUEST);
+- переводит отклики в статусе REQUEST старше MATCH_REQUEST_MAX_AGE_DAYS в REJECTED;
+- удаляет записи hidden_applications для закрытых заявок.
+
+Строки обрабатываются пачками по ARCHIVE_BATCH_SIZE, каждая пачка - отдельная
+транзакция. Строки выбираются с FOR UPDATE SKIP LOCKED: строки, которые сейчас
+изменяют пользователи, пропускаются и будут обработаны при следующем запуске.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.applications.feed import remove_feed_entries
+from src.applications.feed_cache import feed_cache
+from src.db.models.application import Application, ApplicationStatus
+from src.db.models.association_tables import hidden_applications
+from src.db.models.matches import Match, MatchStatus
+from src.dependencies import get_db_session
+from src.settings import feed_settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_batches(
+    session: AsyncSession,
+    batch: Callable[[], Awaitable[int]],
+    batch_size: int
+) -> int:
+    """Выполнение пачек до тех пор, пока пачка не окажется неполной
+
+    Returns:
+        Количество обработанных строк
+    """
+    total = 0
+    while True:
+        processed = await batch()
+        await session.commit()
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+async def archive_stale_applications(session: AsyncSession, max_age: timedelta, batch_size: int) -> int:
+    """Архивация активных заявок старше max_age вместе с отклонением их откликов
+
+    Returns:
+        Количество архивированных заявок
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - max_age
+
+    async def batch() -> int:
+        application_ids = list((await session.execute(
+            select(Application.id)
+            .where(
+                Application.status == ApplicationStatus.ACTIVE,
+                Application.created_at < cutoff
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all())
+        if not application_ids:
+            return 0
+        await session.execute(
+            update(Application)
+            .where(Application.id.in_(application_ids))
+            .values(status=ApplicationStatus.ARCHIVED)
+        )
+        # Отклики на архивную заявку больше нельзя принять
+        await session.execute(
+            update(Match)
+            .where(Match.application_id.in_(application_ids), Match.status == MatchStatus.REQUEST)
+            .values(status=MatchStatus.REJECTED, updated_at=now)
+        )
+        await remove_feed_entries(application_ids, session)
+        return len(application_ids)
+
+    return await _run_batches(session, batch, batch_size)
+
+
+async def expire_stale_matches(session: AsyncSession, max_age: timedelta, batch_size: int) -> int:
+    """Отклонение откликов в статусе REQUEST старше max_age
+
+    Returns:
+        Количество отклоненных откликов
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - max_age
+
+    async def batch() -> int:
+        match_ids = list((await session.execute(
+            select(Match.id)
+            .where(
+                Match.status == MatchStatus.REQUEST,
+                Match.created_at < cutoff
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all())
+        if not match_ids:
+            return 0
+        await session.execute(
+            update(Match)
+            .where(Match.id.in_(match_ids))
+            .values(status=MatchStatus.REJECTED, updated_at=now)
+        )
+        return len(match_ids)
+
+    return await _run_batches(session, batch, batch_size)
+
+
+async def purge_closed_hidden_applications(session: AsyncSession, batch_size: int) -> int:
+    """Удаление скрытий для закрытых (принятых или архивных) заявок
+
+    Returns:
+        Количество удаленных записей
+    """
+
+    async def batch() -> int:
+        rows = [tuple(row) for row in (await session.execute(
+            select(hidden_applications.c.teacher_id, hidden_applications.c.application_id)
+            .join(Application, Application.id == hidden_applications.c.application_id)
+            .where(Application.status != ApplicationStatus.ACTIVE)
+            .limit(batch_size)
+            .with_for_update(of=hidden_applications, skip_locked=True)
+        )).all()]
+        if not rows:
+            return 0
+        key = tuple_(hidden_applications.c.teacher_id, hidden_applications.c.application_id)
+        await session.execute(delete(hidden_applications).where(key.in_(rows)))
+        return len(rows)
+
+    return await _run_batches(session, batch, batch_size)
+
+
+async def run_archiver() -> None:
+    """Периодическая архивация устаревших заявок и откликов"""
+    while True:
+        try:
+            async with get_db_session() as session:
+                archived = await archive_stale_applications(
+                    session,
+                    timedelta(days=feed_settings.APPLICATION_MAX_AGE_DAYS),
+                    feed_settings.ARCHIVE_BATCH_SIZE
+                )
+                if archived:
+                    await feed_cache.bump_version()
+                expired = await expire_stale_matches(
+                    session,
+                    timedelta(days=feed_settings.MATCH_REQUEST_MAX_AGE_DAYS),
+                    feed_settings.ARCHIVE_BATCH_SIZE
+                )
+                purged = await purge_closed_hidden_applications(
+                    session, feed_settings.ARCHIVE_BATCH_SIZE
+                )
+            if archived or expired or purged:
+                logger.info(
+                    "Архивировано заявок: %s, отклонено откликов: %s, удалено скрытий: %s",
+                    archived, expired, purged
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Ошибка архивации заявок: %s", e)
+        await asyncio.sleep(feed_settings.ARCHIVE_INTERVAL)
@@ -0,0 +1,121 @@
+"""Исключения ленты репетитора
+
+Заявки, скрытые репетитором или с его откликом, хранятся в Redis
+множеством ID на каждого репетитора. Лента общая для всех репетиторов,
+исключения применяются к окну ленты одной командой SMISMEMBER, поэтому
+стоимость не зависит от количества скрытых заявок.
+
+Множество строится из БД при первом обращении. Признак построенного
+множества - служебный элемент 0 (ID заявок начинаются с 1).
+"""
+
+import logging
+
+from redis.exceptions import RedisError
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.association_tables import hidden_applications
+from src.db.models.matches import Match
+from src.integrations.redis import redis_service
+from src.settings import feed_settings
+
+logger = logging.getLogger(__name__)
+
+BUILT_MARKER = 0
+
+
+async def query_teacher_exclusions(
+    user_id: int,
+    session: AsyncSession,
+    application_ids: list[int] | None = None
+) -> set[int]:
+    """Заявки, скрытые репетитором или с его откликом (из БД)
+
+    Args:
+        user_id: ID репетитора
+        session: Сессия БД
+        application_ids: Проверяемые заявки (None - все заявки репетитора)
+    """
+    hidden = select(hidden_applications.c.application_id).where(
+        hidden_applications.c.teacher_id == user_id
+    )
+    answered = select(Match.application_id).where(Match.teacher_id == user_id)
+    if application_ids is not None:
+        hidden = hidden.where(hidden_applications.c.application_id.in_(application_ids))
+        answered = answered.where(Match.application_id.in_(application_ids))
+    return set((await session.execute(union(hidden, answered))).scalars().all())
+
+
+class TeacherExclusions:
+    """Множества исключенных заявок репетиторов в Redis"""
+
+    def __init__(self, ttl: int, prefix: str = "feed_exclusions"):
+        """Инициализация хранилища
+
+        Args:
+            ttl: Время жизни множества без обращений (секунды)
+            prefix: Префикс ключей в Redis
+        """
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, user_id: int) -> str:
+        """Ключ множества репетитора"""
+        return f"{self.prefix}:{user_id}"
+
+    async def _build(self, user_id: int, session: AsyncSession) -> set[int]:
+        """Построение множества из БД"""
+        excluded = await query_teacher_exclusions(user_id, session)
+        async with redis_service.redis_client.pipeline(transaction=True) as pipe:
+            pipe.sadd(self._key(user_id), BUILT_MARKER, *excluded)
+            pipe.expire(self._key(user_id), self.ttl)
+            await pipe.execute()
+        return excluded
+
+    async def get_excluded(
+        self,
+        user_id: int,
+        application_ids: list[int],
+        session: AsyncSession
+    ) -> set[int]:
+        """Заявки из списка, которые нужно исключить из ленты репетитора"""
+        if not application_ids:
+            return set()
+
+        key = self._key(user_id)
+        try:
+            async with redis_service.redis_client.pipeline(transaction=False) as pipe:
+                pipe.smismember(key, [BUILT_MARKER, *application_ids])
+                pipe.expire(key, self.ttl)
+                (built, *flags), _ = await pipe.execute()
+            if built:
+                return {application_id for application_id, flag in zip(application_ids, flags) if flag}
+            return await self._build(user_id, session) & set(application_ids)
+        except RedisError as e:
+            logger.warning("Исключения ленты недоступны в Redis: %s", e)
+            return await query_teacher_exclusions(user_id, session, application_ids)
+
+    async def add(self, user_id: int, *application_ids: int) -> None:
+        """Добавление заявок в исключения (после скрытия или отклика)"""
+        if not application_ids:
+            return
+        try:
+            async with redis_service.redis_client.pipeline(transaction=True) as pipe:
+                pipe.sadd(self._key(user_id), *application_ids)
+                pipe.expire(self._key(user_id), self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            # Попытка сбросить множество, чтобы оно было перестроено из БД
+            logger.warning("Не удалось обновить исключения ленты: %s", e)
+            await self.invalidate(user_id)
+
+    async def invalidate(self, user_id: int) -> None:
+        """Удаление множества (будет перестроено при следующем обращении)"""
+        try:
+            await redis_service.delete(self._key(user_id))
+        except RedisError as e:
+            logger.warning("Не удалось удалить исключения ленты: %s", e)
+
+
+teacher_exclusions = TeacherExclusions(ttl=feed_settings.FEED_EXCLUSIONS_TTL)
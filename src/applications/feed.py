@@ -0,0 +1,83 @@
+"""Поддержание ленты заявок (таблица applicationfeeds)
+
+Функции не делают коммит: изменения ленты фиксируются в одной транзакции
+с изменением самой заявки.
+"""
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.application import Application, ApplicationStatus
+from src.db.models.application_feed import ApplicationFeed
+from src.db.models.student import Student
+from src.db.models.subject import Subject
+
+FEED_COLUMNS = [
+    "id",
+    "subject_id",
+    "subject_name",
+    "price",
+    "lessons_count",
+    "student_id",
+    "student_age",
+    "created_at",
+    "description",
+]
+
+
+def select_feed_rows():
+    """Запрос данных ленты для активных заявок"""
+    return (
+        select(
+            Application.id,
+            Application.subject_id,
+            Subject.name,
+            Application.price,
+            Application.lessons_count,
+            Application.student_id,
+            Student.age,
+            Application.created_at,
+            Application.description,
+        )
+        .join(Student, Student.id == Application.student_id)
+        .join(Subject, Subject.id == Application.subject_id)
+        .where(Application.status == ApplicationStatus.ACTIVE)
+    )
+
+
+async def upsert_feed_entry(application_id: int, session: AsyncSession) -> None:
+    """Добавление или обновление заявки в ленте (только для активной заявки)"""
+    stmt = insert(ApplicationFeed).from_select(
+        FEED_COLUMNS,
+        select_feed_rows().where(Application.id == application_id)
+    )
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[ApplicationFeed.id],
+        set_={column: stmt.excluded[column] for column in FEED_COLUMNS if column != "id"},
+    ))
+
+
+async def remove_feed_entry(application_id: int, session: AsyncSession) -> None:
+    """Удаление заявки из ленты (заявка принята, закрыта или отклонена)"""
+    await session.execute(delete(ApplicationFeed).where(ApplicationFeed.id == application_id))
+
+
+async def remove_feed_entries(application_ids: list[int], session: AsyncSession) -> None:
+    """Удаление нескольких заявок из ленты"""
+    await session.execute(delete(ApplicationFeed).where(ApplicationFeed.id.in_(application_ids)))
+
+
+async def update_feed_student_age(student_id: int, age: int | None, session: AsyncSession) -> None:
+    """Обновление возраста ученика в его заявках"""
+    await session.execute(
+        update(ApplicationFeed)
+        .where(ApplicationFeed.student_id == student_id)
+        .values(student_age=age)
+    )
+
+
+async def rebuild_feed(session: AsyncSession) -> None:
+    """Полное перестроение ленты по таблице заявок"""
+    await session.execute(delete(ApplicationFeed))
+    await session.execute(insert(ApplicationFeed).from_select(FEED_COLUMNS, select_feed_rows()))
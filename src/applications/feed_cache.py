@@ -0,0 +1,181 @@
+"""Кэш ленты заявок
+
+Кэшируется общая для всех репетиторов часть ленты: окно заявок, подходящих
+под фильтры (предметы, цена, возраст, количество уроков) начиная с позиции курсора.
+Исключения конкретного репетитора (скрытые заявки и отклики) применяются после.
+
+Ключ - хэш нормализованных фильтров и номер версии ленты. Версия увеличивается
+при любом изменении заявок, поэтому устаревшие записи просто перестают читаться
+и удаляются Redis по TTL.
+
+Одновременные промахи по одному ключу вычисляются один раз: внутри процесса
+через общий Future, между воркерами через блокировку в Redis.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Awaitable, Callable
+
+from pydantic import TypeAdapter, ValidationError
+from redis.exceptions import RedisError
+
+from src.applications.schemas import ApplicationFacets, ApplicationFilters, ApplicationResponse
+from src.integrations.redis import redis_service
+from src.settings import feed_settings
+
+logger = logging.getLogger(__name__)
+
+FeedWindow = list[ApplicationResponse]
+window_adapter = TypeAdapter(FeedWindow)
+
+
+class FeedCache:
+    """Кэш окон ленты заявок с версионной инвалидацией"""
+
+    def __init__(self, ttl: int, lock_timeout: float, prefix: str = "feed_cache"):
+        """Инициализация кэша
+
+        Args:
+            ttl: Время жизни записи (секунды)
+            lock_timeout: Максимальное время ожидания вычисления другим воркером (секунды)
+            prefix: Префикс ключей в Redis
+        """
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+        self._inflight: dict[str, asyncio.Future[FeedWindow]] = {}
+
+    @staticmethod
+    def filters_hash(filters: ApplicationFilters, cursor: str | None, size: int) -> str:
+        """Хэш нормализованных фильтров (порядок и повторы значений не важны)"""
+        normalized = {
+            "q": filters.search_query,
+            "subjects": sorted(set(filters.subjects_list or [])),
+            "lessons": sorted({lessons.value for lessons in filters.lessons_counts_list or []}),
+            "price": [filters.price_min, filters.price_max],
+            "age": [filters.student_age_min, filters.student_age_max],
+            "cursor": cursor,
+            "size": size,
+        }
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def bump_version(self) -> None:
+        """Увеличение версии ленты (после изменения заявок)"""
+        try:
+            await redis_service.incr(f"{self.prefix}:version")
+        except RedisError as e:
+            logger.warning("Не удалось обновить версию ленты: %s", e)
+
+    async def _get_version(self) -> int:
+        """Текущая версия ленты"""
+        version = await redis_service.get(f"{self.prefix}:version")
+        return int(version) if version is not None else 0
+
+    async def _wait_for(self, key: str) -> FeedWindow | None:
+        """Ожидание результата, который вычисляет другой воркер"""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            raw = await redis_service.get(key)
+            if raw is not None:
+                return window_adapter.validate_json(raw)
+        return None
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[FeedWindow]]) -> FeedWindow:
+        """Чтение из Redis или вычисление под блокировкой"""
+        try:
+            raw = await redis_service.get(key)
+            if raw is not None:
+                return window_adapter.validate_json(raw)
+
+            if not await redis_service.set_nx(f"{key}:lock", "1", ex=int(self.lock_timeout) + 1):
+                window = await self._wait_for(key)
+                if window is not None:
+                    return window
+        except (RedisError, ValidationError) as e:
+            logger.warning("Кэш ленты недоступен: %s", e)
+            return await compute()
+
+        window = await compute()
+        try:
+            await redis_service.set(key, window_adapter.dump_json(window), ex=self.ttl)
+            await redis_service.delete(f"{key}:lock")
+        except RedisError as e:
+            logger.warning("Кэш ленты недоступен: %s", e)
+        return window
+
+    async def get_window(
+        self,
+        filters: ApplicationFilters,
+        cursor: str | None,
+        size: int,
+        compute: Callable[[], Awaitable[FeedWindow]]
+    ) -> FeedWindow:
+        """Окно ленты из кэша или вычисленное compute"""
+        if not feed_settings.FEED_CACHE_ENABLED:
+            return await compute()
+
+        try:
+            version = await self._get_version()
+        except RedisError as e:
+            logger.warning("Кэш ленты недоступен: %s", e)
+            return await compute()
+
+        key = f"{self.prefix}:{version}:{self.filters_hash(filters, cursor, size)}"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[FeedWindow] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            window = await self._load(key, compute)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение получат ожидающие запросы; помечаем его обработанным
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(window)
+        return window
+
+    async def get_facets(
+        self,
+        filters: ApplicationFilters,
+        compute: Callable[[], Awaitable[ApplicationFacets]]
+    ) -> ApplicationFacets:
+        """Счетчики по фильтрам из кэша или вычисленные compute"""
+        if not feed_settings.FEED_CACHE_ENABLED:
+            return await compute()
+
+        try:
+            version = await self._get_version()
+            key = f"{self.prefix}:{version}:facets:{self.filters_hash(filters, None, 0)}"
+            raw = await redis_service.get(key)
+            if raw is not None:
+                return ApplicationFacets.model_validate_json(raw)
+        except (RedisError, ValidationError) as e:
+            logger.warning("Кэш ленты недоступен: %s", e)
+            return await compute()
+
+        facets = await compute()
+        try:
+            await redis_service.set(key, facets.model_dump_json(), ex=feed_settings.FEED_FACETS_TTL)
+        except RedisError as e:
+            logger.warning("Кэш ленты недоступен: %s", e)
+        return facets
+
+
+feed_cache = FeedCache(
+    ttl=feed_settings.FEED_CACHE_TTL,
+    lock_timeout=feed_settings.FEED_CACHE_LOCK_TIMEOUT,
+)
@@ -3,11 +3,15 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.dependencies import require_role, UserRole, get_session
+from src.dependencies import require_role, UserRole, get_read_session, get_session
+from src.rate_limit import WRITE_USER_RULE
 from src.applications.service import (
     accept_user_application,
+    bulk_close_user_applications,
+    bulk_hide_user_applications,
     close_user_application,
     create_user_application,
+    get_application_facets,
     get_application_student,
     get_user_applications,
     get_user_detail_application,
@@ -17,8 +21,13 @@ from src.applications.service import (
     update_user_application
 )
 from src.applications.schemas import (
+    ApplicationFacets,
+    ApplicationFeedParams,
     ApplicationFilters,
     ApplicationResponse,
+    ApplicationsPage,
+    BulkApplicationResult,
+    BulkApplicationsRequest,
     CreateApplicationRequest,
     CreateApplicationResponse,
     DetailApplicationResponse,
@@ -32,19 +41,29 @@ router = APIRouter(prefix="/applications", tags=["Applications"])
 
 @router.get("", summary="Получение списка заявок")
 async def get_applications(
-    filters: ApplicationFilters = Query(),
+    filters: ApplicationFeedParams = Query(),
     user_id: int = Depends(require_role(UserRole.TEACHER)),
-    session: AsyncSession = Depends(get_session)
-) -> list[ApplicationResponse]:
-    """Получение списка заявок"""
+    session: AsyncSession = Depends(get_read_session)
+) -> ApplicationsPage:
+    """Получение страницы ленты заявок (следующая страница - по next_cursor)"""
     return await get_user_applications(user_id, session, filters)
 
 
+@router.get("/facets", summary="Количество заявок по значениям фильтров")
+async def get_applications_facets(
+    filters: ApplicationFilters = Query(),
+    _user_id: int = Depends(require_role(UserRole.TEACHER)),
+    session: AsyncSession = Depends(get_read_session)
+) -> ApplicationFacets:
+    """Количество заявок ленты по предметам, количеству уроков и ценам"""
+    return await get_application_facets(session, filters)
+
+
 @router.get("/student", summary="Получение списка своих заявок")
 async def get_student_applications(
     filters: StudentApplicationFilters = Query(),
     user_id: int = Depends(require_role(UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> list[ApplicationResponse]:
     """Получение списка своих заявок"""
     return await get_application_student(user_id, session, filters)
@@ -54,7 +73,7 @@ async def get_student_applications(
 async def get_application(
     application_id: int,
     _user_id: int = Depends(require_role(UserRole.AUTHORIZED)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> DetailApplicationResponse:
     """Получение заявки"""
     return await get_user_detail_application(application_id, session)
@@ -63,18 +82,38 @@ async def get_application(
 @router.post("", summary="Создание заявки")
 async def create_application(
     data: CreateApplicationRequest,
-    user_id: int = Depends(require_role(UserRole.STUDENT)),
+    user_id: int = Depends(require_role(UserRole.STUDENT, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> CreateApplicationResponse:
     """Создание новой заявки"""
     return await create_user_application(user_id, data, session)
 
 
+@router.post("/bulk/hide", summary="Скрыть несколько заявок")
+async def bulk_hide_applications(
+    data: BulkApplicationsRequest,
+    user_id: int = Depends(require_role(UserRole.TEACHER, WRITE_USER_RULE)),
+    session: AsyncSession = Depends(get_session)
+) -> list[BulkApplicationResult]:
+    """Скрыть несколько заявок одним запросом"""
+    return await bulk_hide_user_applications(data.application_ids, user_id, session)
+
+
+@router.post("/bulk/close", summary="Закрыть несколько заявок")
+async def bulk_close_applications(
+    data: BulkApplicationsRequest,
+    user_id: int = Depends(require_role(UserRole.STUDENT, WRITE_USER_RULE)),
+    session: AsyncSession = Depends(get_session)
+) -> list[BulkApplicationResult]:
+    """Закрыть несколько своих заявок одним запросом"""
+    return await bulk_close_user_applications(data.application_ids, user_id, session)
+
+
 @router.patch("/{application_id}", summary="Обновление заявки")
 async def update_application(
     application_id: int,
     data: UpdateApplicationRequest,
-    user_id: int = Depends(require_role(UserRole.STUDENT)),
+    user_id: int = Depends(require_role(UserRole.STUDENT, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> None:
     """Обновление заявки"""
@@ -84,7 +123,7 @@ async def update_application(
 @router.post("/{application_id}/close", summary="Закрыть заявку")
 async def close_application(
     application_id: int,
-    _user_id: int = Depends(require_role(UserRole.STUDENT)),
+    _user_id: int = Depends(require_role(UserRole.STUDENT, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> None:
     """Закрыть заявку"""
@@ -94,7 +133,7 @@ async def close_application(
 @router.post("/{application_id}/request", summary="Откликнуться на заявку")
 async def request_application(
     application_id: int,
-    user_id: int = Depends(require_role(UserRole.TEACHER)),
+    user_id: int = Depends(require_role(UserRole.TEACHER, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> RequestApplicationResponse:
     """Откликнуться на заявку"""
@@ -104,7 +143,7 @@ async def request_application(
 @router.post("/{application_id}/hide", summary="Скрыть заявку")
 async def hide_application(
     application_id: int,
-    user_id: int = Depends(require_role(UserRole.TEACHER)),
+    user_id: int = Depends(require_role(UserRole.TEACHER, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> None:
     """Скрыть заявку"""
@@ -114,7 +153,7 @@ async def hide_application(
 @router.post("/{match_id}/accept", summary="Принять заявку")
 async def accept_application(
     match_id: int,
-    user_id: int = Depends(require_role(UserRole.STUDENT)),
+    user_id: int = Depends(require_role(UserRole.STUDENT, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> None:
     """Принять заявку"""
@@ -124,7 +163,7 @@ async def accept_application(
 @router.post("/{match_id}/reject", summary="Отклонить заявку")
 async def reject_application(
     match_id: int,
-    user_id: int = Depends(require_role(UserRole.STUDENT)),
+    user_id: int = Depends(require_role(UserRole.STUDENT, WRITE_USER_RULE)),
     session: AsyncSession = Depends(get_session)
 ) -> None:
     """Отклонить заявку"""
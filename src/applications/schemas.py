@@ -1,10 +1,12 @@
 """Схемы для работы с заявками"""
 
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, Field
 
 from src.db.models.application import ApplicationStatus, LessonsCount
+from src.settings import feed_settings
 
 
 class CreateApplicationResponse(BaseModel):
@@ -14,6 +16,7 @@ class CreateApplicationResponse(BaseModel):
 
 class ApplicationFilters(BaseModel):
     """Фильтры для получения заявки"""
+    q: str | None = Field(None, min_length=2, max_length=100, description="Поиск по описанию")
     subjects: str | None = Field(None, description="Список предметов через запятую")
     price_min: int | None = Field(None, ge=0, le=100000, description="Нижняя граница цены")
     price_max: int | None = Field(None, ge=0, le=100000, description="Верхняя граница цены")
@@ -21,6 +24,13 @@ class ApplicationFilters(BaseModel):
     student_age_max: int | None = Field(None, ge=0, le=150, description="Верхняя граница возраста")
     lessons_counts: str | None = Field(None, description="Количество уроков через запятую")
 
+    @property
+    def search_query(self) -> str | None:
+        """Возвращает нормализованный поисковый запрос"""
+        if self.q is None:
+            return None
+        return " ".join(self.q.lower().split()) or None  # pylint: disable=no-member
+
     @property
     def subjects_list(self) -> list[str] | None:
         """Возвращает список предметов"""
@@ -36,6 +46,25 @@ class ApplicationFilters(BaseModel):
         return [LessonsCount(s.strip()) for s in self.lessons_counts.split(",") if s.strip()]  # pylint: disable=no-member
 
 
+class FeedSort(str, Enum):
+    """Порядок ленты заявок"""
+
+    PRICE = "price"            # по цене, затем по дате
+    RELEVANCE = "relevance"    # по оценке соответствия репетитору
+
+
+class ApplicationFeedParams(ApplicationFilters):
+    """Фильтры и параметры страницы ленты заявок"""
+    sort: FeedSort = Field(FeedSort.PRICE, description="Порядок ленты")
+    cursor: str | None = Field(None, description="Курсор следующей страницы (next_cursor)")
+    limit: int = Field(
+        feed_settings.FEED_PAGE_SIZE,
+        ge=1,
+        le=feed_settings.FEED_MAX_PAGE_SIZE,
+        description="Количество заявок на странице"
+    )
+
+
 class StudentApplicationFilters(BaseModel):
     """Фильтры для получения заявок ученика"""
     archived: bool | None = Field(None, description="Закрытые")
@@ -49,6 +78,46 @@ class ApplicationResponse(BaseModel):
     lessons_count: LessonsCount = Field(..., description="Количество уроков")
     created_at: datetime = Field(..., description="Дата создания")
     status: ApplicationStatus = Field(..., description="Статус заявки")
+    rank: float | None = Field(
+        None, description="Релевантность (при поиске или сортировке по релевантности)"
+    )
+
+
+class ApplicationsPage(BaseModel):
+    """Страница ленты заявок"""
+    items: list[ApplicationResponse] = Field(..., description="Заявки")
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы")
+
+
+class SubjectFacet(BaseModel):
+    """Количество заявок по предмету"""
+    subject_name: str = Field(..., description="Название предмета")
+    count: int = Field(..., description="Количество заявок")
+
+
+class LessonsCountFacet(BaseModel):
+    """Количество заявок по количеству уроков"""
+    lessons_count: LessonsCount = Field(..., description="Количество уроков")
+    count: int = Field(..., description="Количество заявок")
+
+
+class PriceBucket(BaseModel):
+    """Столбец гистограммы цен"""
+    price_from: int = Field(..., description="Нижняя граница цены (включительно)")
+    price_to: int = Field(..., description="Верхняя граница цены (не включительно)")
+    count: int = Field(..., description="Количество заявок")
+
+
+class ApplicationFacets(BaseModel):
+    """Количество заявок ленты по значениям фильтров
+
+    Количество по каждому измерению учитывает все фильтры, кроме фильтра
+    по самому измерению: показывает, сколько заявок будет при его изменении.
+    """
+    total: int = Field(..., description="Количество заявок с учетом всех фильтров")
+    subjects: list[SubjectFacet] = Field(..., description="По предметам")
+    lessons_counts: list[LessonsCountFacet] = Field(..., description="По количеству уроков")
+    prices: list[PriceBucket] = Field(..., description="Гистограмма цен")
 
 
 class DetailApplicationResponse(ApplicationResponse):
@@ -77,3 +146,22 @@ class UpdateApplicationRequest(BaseModel):
 class RequestApplicationResponse(BaseModel):
     """Схема ответа на отклик на заявку"""
     match_id: int = Field(..., description="ID (№) отклика")
+
+
+class BulkApplicationsRequest(BaseModel):
+    """Схема пакетной операции над заявками"""
+    application_ids: list[int] = Field(..., min_length=1, max_length=100, description="ID заявок")
+
+
+class BulkResultStatus(str, Enum):
+    """Результат пакетной операции для одной заявки"""
+
+    HIDDEN = "hidden"
+    CLOSED = "closed"
+    NOT_FOUND = "not_found"
+
+
+class BulkApplicationResult(BaseModel):
+    """Схема результата пакетной операции для одной заявки"""
+    application_id: int = Field(..., description="ID заявки")
+    status: BulkResultStatus = Field(..., description="Результат")
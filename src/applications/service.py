@@ -1,49 +1,69 @@
 """Сервис для работы с заявками"""
 
 import asyncio
+import base64
+import binascii
+import json
 from datetime import datetime
-from typing import Sequence
+from functools import partial
+from typing import Any, Awaitable, Callable, TypeVar
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, exists, insert, or_, select, update
+from sqlalchemy import (
+    ColumnElement, Float, Integer, and_, case, cast, exists, extract, func, insert, literal,
+    literal_column, null, or_, select, tuple_, update
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert as pg_insert
 
 from src.applications.schemas import (
+    ApplicationFacets,
+    ApplicationFeedParams,
     ApplicationFilters,
     ApplicationResponse,
+    ApplicationsPage,
+    BulkApplicationResult,
+    BulkResultStatus,
     CreateApplicationRequest,
     CreateApplicationResponse,
     DetailApplicationResponse,
+    FeedSort,
+    LessonsCountFacet,
+    PriceBucket,
     RequestApplicationResponse,
     StudentApplicationFilters,
+    SubjectFacet,
     UpdateApplicationRequest
 )
-from src.db.models.application import Application, ApplicationStatus
+from src.applications.exclusions import teacher_exclusions
+from src.applications.feed import remove_feed_entries, remove_feed_entry, upsert_feed_entry
+from src.applications.feed_cache import feed_cache
+from src.db.db_manager import get_database_manager
+from src.db.models.application import Application, ApplicationStatus, LessonsCount
+from src.db.models.application_feed import SEARCH_CONFIG, ApplicationFeed
 from src.db.models.matches import Match, MatchStatus
 from src.db.models.subject import Subject
 from src.db.models.teacher import Teacher
 from src.db.models.student import Student
 from src.db.models.association_tables import hidden_applications, teacher_subjects
 from src.integrations.notification import new_application_newsletter, send_notification
+from src.settings import feed_settings
+from src.subjects.registry import subject_registry
+from src.teacher.audience import teacher_audience
+
+# Максимальное количество окон ленты, просматриваемых за один запрос
+FEED_MAX_WINDOWS = 5
+
+T = TypeVar("T")
 
 
 async def find_teachers(
     session: AsyncSession,
     subject_id: int,
     price: int
-) -> Sequence[Teacher]:
-    """Находит репетиторов для рассылки уведомлений"""
-    return (await session.execute(
-        select(Teacher)
-        .join(teacher_subjects, teacher_subjects.c.teacher_id == Teacher.id)
-        .where(
-            teacher_subjects.c.subject_id == subject_id,
-            Teacher.application_notification.is_(True),
-            Teacher.rate.is_not(None),
-            Teacher.telegram_id.is_not(None),
-            Teacher.rate.between(price * 0.9, price * 1.1)
-        )
-    )).scalars().all()
+) -> list[int]:
+    """Находит Telegram ID репетиторов для рассылки уведомлений"""
+    return await teacher_audience.find(subject_id, price, session)
 
 
 async def create_user_application(
@@ -52,15 +72,13 @@ async def create_user_application(
     session: AsyncSession
 ) -> CreateApplicationResponse:
     """Создание заявки"""
-    subject = (await session.execute(
-        select(Subject).where(Subject.name == data.subject_name)
-    )).scalar_one_or_none()
-    if not subject:
+    subject_id = await subject_registry.get_id(data.subject_name, session)
+    if subject_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Предмет не найден")
 
     application = Application(
         student_id=user_id,
-        subject_id=subject.id,
+        subject_id=subject_id,
         price=data.price,
         lessons_count=data.lessons_count,
         description=data.description,
@@ -68,13 +86,16 @@ async def create_user_application(
         status=ApplicationStatus.ACTIVE
     )
     session.add(application)
+    await session.flush()
+    await upsert_feed_entry(application.id, session)
     await session.commit()
+    await feed_cache.bump_version()
     await session.refresh(application)
 
     # Рассылка уведомлений репетиторам
     new_application_newsletter(
-        teachers=(await find_teachers(session, subject.id, data.price)),
-        subject_name=subject.name,
+        telegram_ids=(await find_teachers(session, subject_id, data.price)),
+        subject_name=data.subject_name,
         price=data.price,
         date=application.created_at,
         lessons_count=data.lessons_count
@@ -110,12 +131,10 @@ async def update_user_application(
         )
 
     if data.subject_name:
-        subject = (await session.execute(
-            select(Subject).where(Subject.name == data.subject_name)
-        )).scalar_one_or_none()
-        if not subject:
+        subject_id = await subject_registry.get_id(data.subject_name, session)
+        if subject_id is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Предмет не найден")
-        application.subject_id = subject.id
+        application.subject_id = subject_id
 
     if data.price:
         application.price = data.price
@@ -127,15 +146,18 @@ async def update_user_application(
         application.description = data.description
 
     application.created_at = datetime.utcnow()
+    await session.flush()
+    await upsert_feed_entry(application.id, session)
     await session.commit()
+    await feed_cache.bump_version()
 
-    subject_name = data.subject_name or (await session.execute(
-        select(Subject.name).where(Subject.id == application.subject_id)
-    )).scalar_one()
+    subject_name = data.subject_name or await subject_registry.get_name(
+        application.subject_id, session
+    ) or ""
 
     # Рассылка уведомлений репетиторам
     new_application_newsletter(
-        teachers=(await find_teachers(session, application.subject_id, application.price)),
+        telegram_ids=(await find_teachers(session, application.subject_id, application.price)),
         subject_name=subject_name,
         price=application.price,
         date=application.created_at,
@@ -143,94 +165,345 @@ async def update_user_application(
     )
 
 
-async def get_user_applications(
-    user_id: int,
-    session: AsyncSession,
-    filters: ApplicationFilters,
-    limit: int = 100,
-    offset: int = 0
-) -> list[ApplicationResponse]:
-    """Получение списка заявок"""
-    query = (
-        select(
-            Application,
-            Subject.name.label("subject_name")
-        )
-        .join(Student, Student.id == Application.student_id)
-        .join(Subject, Subject.id == Application.subject_id)
-        .outerjoin(
-            hidden_applications,
-            and_(
-                hidden_applications.c.application_id == Application.id,
-                hidden_applications.c.teacher_id == user_id
-            )
-        )
-        .outerjoin(
-            Match,
-            and_(
-                Match.application_id == Application.id,
-                Match.teacher_id == user_id
-            )
-        )
-        .where(
-            Application.status == ApplicationStatus.ACTIVE,
-            hidden_applications.c.application_id.is_(None),
-            Match.id.is_(None),
-        )
-        .order_by(
-            Application.price.desc(),
-            Application.created_at.desc()
-        )
-    )
+def encode_feed_cursor(
+    entry: ApplicationFeed | Application | ApplicationResponse,
+    rank: float | None = None
+) -> str:
+    """Курсор ленты: позиция последней заявки страницы (price, created_at, id[, rank])"""
+    position: list[Any] = [entry.price, entry.created_at.isoformat(), entry.id]
+    if rank is not None:
+        position.append(rank)
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_feed_cursor(cursor: str) -> tuple[int, datetime, int, float | None]:
+    """Разбор курсора ленты"""
+    try:
+        price, created_at, application_id, *rank = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(rank) > 1:
+            raise ValueError("Лишние элементы курсора")
+        return (
+            int(price),
+            datetime.fromisoformat(created_at),
+            int(application_id),
+            float(rank[0]) if rank else None,
+        )
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Неверный курсор"
+        ) from e
+
+
+def feed_search_query(filters: ApplicationFilters) -> ColumnElement | None:
+    """Поисковый запрос tsquery (None, если поиск не задан)"""
+    search = filters.search_query
+    if not search:
+        return None
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), search)
+
+
+def feed_filter_conditions(filters: ApplicationFilters) -> dict[str, list[ColumnElement[bool]]]:
+    """Условия фильтров ленты, сгруппированные по измерениям
+
+    Ключи: search, subjects, price, age, lessons.
+    """
+    conditions: dict[str, list[ColumnElement[bool]]] = {
+        "search": [], "subjects": [], "price": [], "age": [], "lessons": []
+    }
+
+    # Полнотекстовый поиск (GIN индекс по search_vector)
+    ts_query = feed_search_query(filters)
+    if ts_query is not None:
+        conditions["search"].append(ApplicationFeed.search_vector.op("@@")(ts_query))
 
-    # Фильтры
     if filters.subjects_list:
-        query = query.where(Subject.name.in_(filters.subjects_list))
+        conditions["subjects"].append(ApplicationFeed.subject_name.in_(filters.subjects_list))
 
     if filters.price_min is not None:
-        query = query.where(Application.price >= filters.price_min)
+        conditions["price"].append(ApplicationFeed.price >= filters.price_min)
 
     if filters.price_max is not None:
-        query = query.where(Application.price <= filters.price_max)
+        conditions["price"].append(ApplicationFeed.price <= filters.price_max)
 
     if filters.student_age_min is not None:
-        query = query.where(
+        conditions["age"].append(
             or_(
-                Student.age >= filters.student_age_min,
-                Student.age.is_(None)
+                ApplicationFeed.student_age >= filters.student_age_min,
+                ApplicationFeed.student_age.is_(None)
             )
         )
 
     if filters.student_age_max is not None:
-        query = query.where(
+        conditions["age"].append(
             or_(
-                Student.age <= filters.student_age_max,
-                Student.age.is_(None)
+                ApplicationFeed.student_age <= filters.student_age_max,
+                ApplicationFeed.student_age.is_(None)
             )
         )
 
     if filters.lessons_counts_list:
-        query = query.where(Application.lessons_count.in_(filters.lessons_counts_list))
+        conditions["lessons"].append(ApplicationFeed.lessons_count.in_(filters.lessons_counts_list))
+
+    return conditions
+
+
+async def teacher_relevance_score(user_id: int, session: AsyncSession) -> ColumnElement[float]:
+    """Оценка соответствия заявки репетитору (выражение для сортировки ленты)
+
+    Сумма слагаемых с весами из настроек:
+    - предмет заявки входит в предметы репетитора (0 или 1);
+    - близость цены заявки к ставке репетитора (от 0 до 1, 1 - цена равна ставке);
+    - новизна: линейна по дате создания, поэтому оценка заявки не меняется
+      со временем и пригодна для курсора;
+    - количество уроков (FEW - 0, MEDIUM - 0.5, MANY - 1).
+    """
+    rate = await session.scalar(select(Teacher.rate).where(Teacher.id == user_id))
+    subject_ids = (await session.execute(
+        select(teacher_subjects.c.subject_id).where(teacher_subjects.c.teacher_id == user_id)
+    )).scalars().all()
+
+    def weight(value: float) -> ColumnElement[float]:
+        """Вес как параметр запроса"""
+        return literal(value, Float())
+
+    score: ColumnElement[float] = weight(0.0)
+    if subject_ids:
+        score = score + weight(feed_settings.FEED_RANK_SUBJECT_WEIGHT) * case(
+            (ApplicationFeed.subject_id.in_(subject_ids), 1.0), else_=0.0
+        )
+    if rate:
+        score = score + weight(feed_settings.FEED_RANK_PRICE_WEIGHT) * func.greatest(
+            0.0, 1.0 - func.abs(ApplicationFeed.price - rate) / weight(float(rate))
+        )
+    score = score + weight(feed_settings.FEED_RANK_RECENCY_WEIGHT) * (
+        extract("epoch", ApplicationFeed.created_at)
+        / weight(86400 * feed_settings.FEED_RANK_RECENCY_DAYS)
+    )
+    score = score + weight(feed_settings.FEED_RANK_LESSONS_WEIGHT) * case(
+        (ApplicationFeed.lessons_count == LessonsCount.MANY, 1.0),
+        (ApplicationFeed.lessons_count == LessonsCount.MEDIUM, 0.5),
+        else_=0.0,
+    )
+    return score
+
+
+async def query_feed_window(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    session: AsyncSession,
+    filters: ApplicationFilters,
+    cursor: str | None,
+    size: int,
+    score: ColumnElement[float] | None = None
+) -> list[ApplicationResponse]:
+    """Окно ленты после позиции cursor
+
+    Без score - общая для всех репетиторов часть ленты. При поиске или заданной
+    оценке score заявки упорядочены сначала по релевантности, затем как обычно.
+    """
+    # Ключ сортировки (он же позиция курсора)
+    sort_key: list[Any] = [
+        ApplicationFeed.price,
+        ApplicationFeed.created_at,
+        ApplicationFeed.id,
+    ]
+    rank: ColumnElement = null()
+
+    ts_query = feed_search_query(filters)
+    if ts_query is not None:
+        rank = func.ts_rank(ApplicationFeed.search_vector, ts_query)
+    if score is not None:
+        rank = score if ts_query is None else (
+            score + literal(feed_settings.FEED_RANK_SEARCH_WEIGHT, Float()) * rank
+        )
+    ranked = ts_query is not None or score is not None
+    if ranked:
+        sort_key.insert(0, rank)
+
+    query = (
+        select(ApplicationFeed, rank.label("rank"))
+        .where(*(condition for group in feed_filter_conditions(filters).values() for condition in group))
+        .order_by(*(column.desc() for column in sort_key))
+    )
 
-    # Пагинация
-    query = query.limit(limit).offset(offset)
+    # Пагинация по ключу: заявки после последней заявки предыдущей страницы
+    if cursor:
+        price, created_at, last_id, last_rank = decode_feed_cursor(cursor)
+        if (last_rank is None) == ranked:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Курсор не соответствует поисковому запросу или сортировке"
+            )
+        position = [
+            literal(price, ApplicationFeed.price.type),
+            literal(created_at, ApplicationFeed.created_at.type),
+            literal(last_id, ApplicationFeed.id.type),
+        ]
+        if last_rank is not None:
+            position.insert(0, literal(last_rank, Float()))
+        query = query.where(tuple_(*sort_key) < tuple_(*position))
 
-    result = await session.execute(query)
-    rows = result.all()
+    rows = (await session.execute(query.limit(size))).all()
 
     return [
         ApplicationResponse(
-            id=app.id,
-            subject_name=subject_name,
-            price=app.price,
-            lessons_count=app.lessons_count,
-            created_at=app.created_at,
-            status=app.status,
-        )
-        for app, subject_name in rows
+            id=entry.id,
+            subject_name=entry.subject_name,
+            price=entry.price,
+            lessons_count=entry.lessons_count,
+            created_at=entry.created_at,
+            status=ApplicationStatus.ACTIVE,
+            rank=entry_rank,
+        )
+        for entry, entry_rank in rows
     ]
 
 
+async def query_primary(
+    query: Callable[..., Awaitable[T]],
+    session: AsyncSession,
+    *args: Any
+) -> T:
+    """Выполнение запроса для кэша ленты в основной базе
+
+    Сессия чтения может быть подключена к отстающей реплике: вычисленное на ней
+    окно попало бы в кэш под новой версией ленты и отменило бы инвалидацию.
+    """
+    async with get_database_manager().primary_session(session) as primary:
+        return await query(primary, *args)
+
+
+async def get_user_applications(
+    user_id: int,
+    session: AsyncSession,
+    filters: ApplicationFeedParams
+) -> ApplicationsPage:
+    """Получение страницы ленты заявок
+
+    Окна ленты берутся из кэша, затем из них убираются заявки, скрытые
+    репетитором или с его откликом. Если после этого заявок на страницу
+    не хватает, читается следующее окно. Окна ленты по релевантности
+    зависят от репетитора и не кэшируются.
+    """
+    size = filters.limit + feed_settings.FEED_CACHE_OVERFETCH
+    items: list[ApplicationResponse] = []
+    cursor = filters.cursor
+    score = (
+        await teacher_relevance_score(user_id, session)
+        if filters.sort == FeedSort.RELEVANCE else None
+    )
+
+    for _ in range(FEED_MAX_WINDOWS):
+        if score is not None:
+            window = await query_feed_window(session, filters, cursor, size, score)
+        else:
+            window = await feed_cache.get_window(filters, cursor, size, partial(
+                query_primary, query_feed_window, session, filters, cursor, size
+            ))
+        excluded = await teacher_exclusions.get_excluded(
+            user_id, [item.id for item in window], session
+        )
+
+        for item in window:
+            if item.id in excluded:
+                continue
+            if len(items) == filters.limit:
+                return ApplicationsPage(
+                    items=items, next_cursor=encode_feed_cursor(items[-1], items[-1].rank)
+                )
+            items.append(item)
+
+        if len(window) < size:
+            return ApplicationsPage(items=items, next_cursor=None)
+        cursor = encode_feed_cursor(window[-1], window[-1].rank)
+
+    # Почти все просмотренные заявки исключены - продолжение со следующей позиции
+    return ApplicationsPage(items=items, next_cursor=cursor)
+
+
+async def query_feed_facets(  # pylint: disable=not-callable
+    session: AsyncSession,
+    filters: ApplicationFilters
+) -> ApplicationFacets:
+    """Счетчики ленты по предметам, количеству уроков и ценам одним запросом
+
+    GROUPING SETS дает строку на каждый предмет, количество уроков, столбец
+    гистограммы и общую строку. Для каждого измерения считается свой
+    count(*) FILTER без фильтра по этому измерению.
+    """
+    conditions = feed_filter_conditions(filters)
+
+    def count_without(*dimensions: str) -> ColumnElement[int]:
+        """Количество заявок с учетом фильтров, кроме фильтров по dimensions"""
+        applied = [
+            condition
+            for dimension in ("subjects", "price", "lessons")
+            if dimension not in dimensions
+            for condition in conditions[dimension]
+        ]
+        return func.count().filter(and_(*applied)) if applied else func.count()
+
+    step = literal_column(str(int(feed_settings.FEED_FACETS_PRICE_STEP)), Integer)
+    price_from = (ApplicationFeed.price // step) * step
+    rows = (await session.execute(
+        select(
+            ApplicationFeed.subject_name,
+            ApplicationFeed.lessons_count,
+            price_from.label("price_from"),
+            count_without().label("total"),
+            count_without("subjects").label("subjects_count"),
+            count_without("lessons").label("lessons_count_count"),
+            count_without("price").label("price_count"),
+        )
+        .where(*conditions["search"], *conditions["age"])
+        .group_by(func.grouping_sets(
+            tuple_(ApplicationFeed.subject_name),
+            tuple_(ApplicationFeed.lessons_count),
+            tuple_(price_from),
+            tuple_(),
+        ))
+    )).all()
+
+    total = 0
+    subjects: list[SubjectFacet] = []
+    lessons_counts: list[LessonsCountFacet] = []
+    prices: list[PriceBucket] = []
+    for row in rows:
+        if row.subject_name is not None:
+            subjects.append(SubjectFacet(subject_name=row.subject_name, count=row.subjects_count))
+        elif row.lessons_count is not None:
+            lessons_counts.append(
+                LessonsCountFacet(lessons_count=row.lessons_count, count=row.lessons_count_count)
+            )
+        elif row.price_from is not None:
+            if row.price_count:
+                prices.append(PriceBucket(
+                    price_from=row.price_from,
+                    price_to=row.price_from + feed_settings.FEED_FACETS_PRICE_STEP,
+                    count=row.price_count,
+                ))
+        else:
+            total = row.total
+
+    return ApplicationFacets(
+        total=total,
+        subjects=sorted(subjects, key=lambda facet: (-facet.count, facet.subject_name)),
+        lessons_counts=sorted(
+            lessons_counts, key=lambda facet: list(LessonsCount).index(facet.lessons_count)
+        ),
+        prices=sorted(prices, key=lambda bucket: bucket.price_from),
+    )
+
+
+async def get_application_facets(
+    session: AsyncSession,
+    filters: ApplicationFilters
+) -> ApplicationFacets:
+    """Счетчики ленты по значениям фильтров (кэшируются вместе с лентой)"""
+    return await feed_cache.get_facets(
+        filters, partial(query_primary, query_feed_facets, session, filters)
+    )
+
+
 async def get_application_student(
     user_id: int,
     session: AsyncSession,
@@ -321,6 +594,39 @@ async def hide_user_application(
     )
     await session.execute(stmt)
     await session.commit()
+    await teacher_exclusions.add(user_id, application_id)
+
+
+async def bulk_hide_user_applications(
+    application_ids: list[int],
+    user_id: int,
+    session: AsyncSession
+) -> list[BulkApplicationResult]:
+    """Скрытие нескольких заявок репетитором (уже скрытые заявки не ошибка)"""
+    application_ids = list(dict.fromkeys(application_ids))
+    existing = set((await session.execute(
+        select(Application.id).where(Application.id.in_(application_ids))
+    )).scalars().all())
+    if existing:
+        await session.execute(
+            pg_insert(hidden_applications)
+            .values([
+                {"application_id": application_id, "teacher_id": user_id}
+                for application_id in existing
+            ])
+            .on_conflict_do_nothing()
+        )
+        await session.commit()
+        await teacher_exclusions.add(user_id, *existing)
+
+    return [
+        BulkApplicationResult(
+            application_id=application_id,
+            status=BulkResultStatus.HIDDEN if application_id in existing else BulkResultStatus.NOT_FOUND
+        )
+        for application_id in application_ids
+    ]
+
 
 async def request_user_application(
     application_id: int,
@@ -367,6 +673,7 @@ async def request_user_application(
     session.add(match)
     await session.commit()
     await session.refresh(match)
+    await teacher_exclusions.add(user_id, application_id)
 
     # Отправка уведомления ученику
     student = (
@@ -432,8 +739,10 @@ async def accept_user_application(
             updated_at=datetime.utcnow()
         )
     )
+    await remove_feed_entry(application.id, session)
 
     await session.commit()
+    await feed_cache.bump_version()
 
     # Отправка уведомления репетитору
     teacher = (
@@ -482,7 +791,9 @@ async def reject_user_application(
     application.status = ApplicationStatus.ARCHIVED
     match.status = MatchStatus.REJECTED
     match.updated_at = datetime.utcnow()
+    await remove_feed_entry(application.id, session)
     await session.commit()
+    await feed_cache.bump_version()
 
 
 async def close_user_application(
@@ -503,4 +814,37 @@ async def close_user_application(
             detail="Заявка не найдена"
         )
     application.status = ApplicationStatus.ARCHIVED
+    await remove_feed_entry(application.id, session)
     await session.commit()
+    await feed_cache.bump_version()
+
+
+async def bulk_close_user_applications(
+    application_ids: list[int],
+    user_id: int,
+    session: AsyncSession
+) -> list[BulkApplicationResult]:
+    """Закрытие нескольких активных заявок ученика"""
+    application_ids = list(dict.fromkeys(application_ids))
+    closed = set((await session.execute(
+        update(Application)
+        .where(
+            Application.id.in_(application_ids),
+            Application.student_id == user_id,
+            Application.status == ApplicationStatus.ACTIVE
+        )
+        .values(status=ApplicationStatus.ARCHIVED)
+        .returning(Application.id)
+    )).scalars().all())
+    if closed:
+        await remove_feed_entries(list(closed), session)
+        await session.commit()
+        await feed_cache.bump_version()
+
+    return [
+        BulkApplicationResult(
+            application_id=application_id,
+            status=BulkResultStatus.CLOSED if application_id in closed else BulkResultStatus.NOT_FOUND
+        )
+        for application_id in application_ids
+    ]
@@ -0,0 +1,251 @@
+"""Кэш идентификации пользователей
+
+Хранит роль и флаги активности/удаления пользователя, чтобы проверка прав
+не обращалась к базе данных на каждом запросе.
+Двухуровневый кэш:
+    - LRU в памяти процесса с коротким TTL
+    - Redis, общий для всех воркеров API
+
+Версия профиля - счетчик в таблице пользователя, который попадает в access токен.
+Увеличение счетчика отзывает все ранее выданные токены пользователя. Redis
+хранит копию версии с TTL; при ее отсутствии или недоступности Redis версия
+читается из БД, поэтому потеря ключа не делает старые токены снова действительными.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, Field, ValidationError
+from redis.exceptions import RedisError
+from sqlalchemy import literal, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.student import Student
+from src.db.models.teacher import Teacher
+from src.integrations.redis import redis_service
+from src.settings import cache_settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VERSION_PREFIX = "profile_version"
+
+
+def profile_version_key(user_id: int) -> str:
+    """Ключ версии профиля в Redis"""
+    return f"{PROFILE_VERSION_PREFIX}:{user_id}"
+
+
+class UserIdentity(BaseModel):
+    """Данные пользователя, необходимые для проверки прав"""
+    id: int = Field(..., description="ID пользователя")
+    role: str = Field(..., description="Роль пользователя: student или teacher")
+    active: bool = Field(..., description="Активность")
+    is_deleted: bool = Field(..., description="Удален или нет")
+
+
+class UserIdentityCache:
+    """LRU-кэш с TTL в памяти процесса поверх Redis"""
+
+    def __init__(self, ttl: int, local_ttl: int, max_size: int, prefix: str = "user_identity"):
+        """Инициализация кэша
+
+        Args:
+            ttl: Время жизни записи в Redis (секунды)
+            local_ttl: Время жизни записи в памяти процесса (секунды)
+            max_size: Максимальное количество записей в памяти процесса
+            prefix: Префикс ключей в Redis
+        """
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.max_size = max_size
+        self.prefix = prefix
+        self._local: OrderedDict[int, tuple[float, UserIdentity]] = OrderedDict()
+
+    def _key(self, user_id: int) -> str:
+        """Ключ записи в Redis"""
+        return f"{self.prefix}:{user_id}"
+
+    def _remember(self, identity: UserIdentity) -> None:
+        """Сохранение записи в памяти процесса с вытеснением самых старых"""
+        self._local[identity.id] = (time.monotonic() + self.local_ttl, identity)
+        self._local.move_to_end(identity.id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, user_id: int) -> UserIdentity | None:
+        """Получение записи из кэша"""
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, identity = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(user_id)
+                return identity
+            del self._local[user_id]
+
+        try:
+            raw = await redis_service.get(self._key(user_id))
+        except RedisError as e:
+            logger.warning("Кэш пользователей недоступен: %s", e)
+            return None
+        if raw is None:
+            return None
+
+        try:
+            identity = UserIdentity.model_validate_json(raw)
+        except ValidationError:
+            return None
+        self._remember(identity)
+        return identity
+
+    async def set(self, identity: UserIdentity) -> None:
+        """Сохранение записи в кэш"""
+        self._remember(identity)
+        try:
+            await redis_service.set(self._key(identity.id), identity.model_dump_json(), ex=self.ttl)
+        except RedisError as e:
+            logger.warning("Кэш пользователей недоступен: %s", e)
+
+    async def invalidate(self, user_id: int) -> None:
+        """Удаление записи и версии профиля из кэша (при удалении или деактивации профиля)"""
+        self._local.pop(user_id, None)
+        try:
+            await redis_service.delete(self._key(user_id), profile_version_key(user_id))
+        except RedisError as e:
+            logger.warning("Кэш пользователей недоступен: %s", e)
+
+
+user_identity_cache = UserIdentityCache(
+    ttl=cache_settings.USER_CACHE_TTL,
+    local_ttl=cache_settings.USER_CACHE_LOCAL_TTL,
+    max_size=cache_settings.USER_CACHE_MAX_SIZE,
+)
+
+
+async def load_user_identity(user_id: int, session: AsyncSession) -> UserIdentity | None:
+    """Загрузка роли и флагов пользователя одним запросом"""
+    query = union_all(
+        select(
+            literal("student").label("role"),
+            Student.active,
+            Student.is_deleted
+        ).where(Student.id == user_id),
+        select(
+            literal("teacher").label("role"),
+            Teacher.active,
+            Teacher.is_deleted
+        ).where(Teacher.id == user_id),
+    ).limit(1)
+
+    row = (await session.execute(query)).one_or_none()
+    if row is None:
+        return None
+
+    role, active, is_deleted = row
+    return UserIdentity(id=user_id, role=role, active=active, is_deleted=is_deleted)
+
+
+async def get_user_identity(user_id: int, session: AsyncSession) -> UserIdentity:
+    """Возвращает роль и флаги пользователя, по возможности из кэша"""
+    identity = await user_identity_cache.get(user_id)
+    if identity is not None:
+        return identity
+
+    identity = await load_user_identity(user_id, session)
+    if identity is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пользователь не найден"
+        )
+
+    await user_identity_cache.set(identity)
+    return identity
+
+
+async def load_profile_version(user_id: int, session: AsyncSession) -> int | None:
+    """Версия профиля из БД (None, если пользователь не найден)"""
+    query = union_all(
+        select(Student.profile_version).where(Student.id == user_id),
+        select(Teacher.profile_version).where(Teacher.id == user_id),
+    ).limit(1)
+    return (await session.execute(query)).scalar_one_or_none()
+
+
+async def get_profile_version(user_id: int, session: AsyncSession) -> int | None:
+    """Текущая версия профиля: из Redis, при промахе или ошибке - из БД
+
+    Returns:
+        Версия профиля или None, если пользователь не найден
+    """
+    key = profile_version_key(user_id)
+    try:
+        raw = await redis_service.get(key)
+        if raw is not None:
+            return int(raw)
+    except RedisError as e:
+        logger.warning("Не удалось получить версию профиля из Redis: %s", e)
+
+    version = await load_profile_version(user_id, session)
+    if version is not None:
+        try:
+            await redis_service.set(key, str(version), ex=cache_settings.USER_CACHE_TTL)
+        except RedisError as e:
+            logger.warning("Не удалось сохранить версию профиля в Redis: %s", e)
+    return version
+
+
+async def bump_profile_version(
+    model: type[Student] | type[Teacher],
+    user_id: int,
+    session: AsyncSession
+) -> None:
+    """Увеличение версии профиля - отзыв всех выданных access токенов (без коммита)
+
+    После коммита нужно сбросить кэш: user_identity_cache.invalidate(user_id).
+    """
+    await session.execute(
+        update(model)
+        .where(model.id == user_id)
+        .values(profile_version=model.profile_version + 1)
+    )
+
+
+async def build_token_claims(user_id: int, role: str, session: AsyncSession) -> dict[str, Any]:
+    """Дополнительные поля access токена: роль и версия профиля
+
+    Если версию получить не удалось, поля не добавляются
+    и проверка прав для такого токена идет через кэш/БД.
+    """
+    version = await get_profile_version(user_id, session)
+    if version is None:
+        return {}
+    return {"role": role, "ver": version}
+
+
+async def check_token_claims(
+    user_id: int,
+    claims: dict[str, Any],
+    session: AsyncSession
+) -> str | None:
+    """Проверка роли и версии профиля из токена
+
+    Returns:
+        Роль пользователя, если токен можно авторизовать без БД, иначе None
+    """
+    role = claims.get("role")
+    version = claims.get("ver")
+    if role is None or not isinstance(version, int):
+        return None
+
+    current_version = await get_profile_version(user_id, session)
+    if current_version is None:
+        return None
+
+    if version < current_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Сессия недействительна"
+        )
+    return role
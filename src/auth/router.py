@@ -2,17 +2,18 @@
 
 from fastapi import APIRouter, Response, Request, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from authx.exceptions import JWTDecodeError
+from authx.exceptions import JWTDecodeError, MissingTokenError
 from jose import jwt # type: ignore
 
 from src.dependencies import get_session
+from src.auth.identity import build_token_claims
 from src.auth.service import (
-    check_user_refresh,
+    end_user_session,
     login_user,
     login_verify_user,
     register_user,
-    update_refresh_id,
-    update_ip
+    rotate_user_session,
+    start_user_session
 )
 from src.auth.schemas import (
     LoginRequest,
@@ -22,11 +23,24 @@ from src.auth.schemas import (
     RegisterSchema
 )
 from src.auth.security import config, security
+from src.rate_limit import (
+    LOGIN_IP_RULE,
+    LOGIN_USERNAME_RULE,
+    LOGIN_VERIFY_IP_RULE,
+    LOGIN_VERIFY_USERNAME_RULE,
+    REGISTER_IP_RULE,
+    rate_limit_ip,
+    rate_limiter
+)
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/register", summary="Регистрация пользователя")
+@router.post(
+    "/register",
+    summary="Регистрация пользователя",
+    dependencies=[Depends(rate_limit_ip(REGISTER_IP_RULE))]
+)
 async def register(
     data: RegisterSchema,
     session: AsyncSession = Depends(get_session)
@@ -35,16 +49,25 @@ async def register(
     return await register_user(data, session)
 
 
-@router.post("/login", summary="Запрос на получение кода подтверждения")
+@router.post(
+    "/login",
+    summary="Запрос на получение кода подтверждения",
+    dependencies=[Depends(rate_limit_ip(LOGIN_IP_RULE))]
+)
 async def login(
     data: LoginRequest,
     session: AsyncSession = Depends(get_session)
 ) -> None:
     """Запрос на получение кода подтверждения"""
+    await rate_limiter.hit(LOGIN_USERNAME_RULE, data.username.lower())
     await login_user(data, session)
 
 
-@router.post("/login/verify", summary="Проверка кода подтверждения и вход в систему")
+@router.post(
+    "/login/verify",
+    summary="Проверка кода подтверждения и вход в систему",
+    dependencies=[Depends(rate_limit_ip(LOGIN_VERIFY_IP_RULE))]
+)
 async def login_verify(
     data: LoginVerifySchema,
     request: Request,
@@ -52,17 +75,19 @@ async def login_verify(
     session: AsyncSession = Depends(get_session)
 ) -> LoginResponse:
     """Проверка кода подтверждения и вход в систему"""
+    await rate_limiter.hit(LOGIN_VERIFY_USERNAME_RULE, data.username.lower())
     user_id, role = await login_verify_user(data, session)
 
     # Создание токенов
-    access_token = security.create_access_token(uid=str(user_id))
+    access_token = security.create_access_token(
+        uid=str(user_id), data=await build_token_claims(user_id, role, session)
+    )
     refresh_token = security.create_refresh_token(uid=str(user_id))
 
-    # Обновление refresh_id и IP
+    # Сохранение refresh_id и IP
     refresh_payload = jwt.get_unverified_claims(refresh_token)
     client_host = request.client.host if request.client else ""  # для mypy, использоваться не будет
-    await update_refresh_id(user_id, refresh_payload["jti"], session)
-    await update_ip(user_id, client_host, session)
+    await start_user_session(user_id, role, refresh_payload["jti"], client_host, session)
 
     # Установка токенов в cookies
     security.set_access_cookies(access_token, response)
@@ -73,9 +98,20 @@ async def login_verify(
 
 @router.post("/logout", summary="Выход из системы")
 async def logout(
-    response: Response
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
 ) -> None:
     """Выход из системы"""
+    # Завершение сессии текущего устройства
+    try:
+        refresh_token = await security.get_refresh_token_from_request(request)
+        token_payload = security.verify_token(refresh_token, verify_csrf=False)
+        if token_payload.jti:
+            await end_user_session(token_payload.jti, session)
+    except (MissingTokenError, JWTDecodeError):
+        pass
+
     # Удаление токенов из cookies
     security.unset_cookies(response)
 
@@ -95,16 +131,16 @@ async def refresh(
         refresh_jti = token_payload.jti or ""  # для mypy, использоваться не будет
         client_host = request.client.host if request.client else ""  # для mypy, использоваться не будет
 
-        # Проверка refresh_id и IP
-        await check_user_refresh(user_id, client_host, refresh_jti, session)
-
-        # Создание новых токенов
-        new_access_token = security.create_access_token(uid=str(user_id))
+        # Проверка refresh_id и IP с заменой на новый refresh_id
         new_refresh_token = security.create_refresh_token(uid=str(user_id))
-
-        # Обновление refresh_id
         refresh_payload = jwt.get_unverified_claims(new_refresh_token)
-        await update_refresh_id(user_id, refresh_payload["jti"], session)
+        role = await rotate_user_session(
+            user_id, client_host, refresh_jti, refresh_payload["jti"], session
+        )
+
+        new_access_token = security.create_access_token(
+            uid=str(user_id), data=await build_token_claims(user_id, role, session)
+        )
 
         # Установка новых токенов в cookies
         response.delete_cookie(config.JWT_ACCESS_COOKIE_NAME)
@@ -1,17 +1,19 @@
 """Сервисные функции аутентификации"""
 
+import asyncio
 import json
+import logging
 import secrets
 import hashlib
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Union
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import delete, select, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.settings import redis_settings
-from src.dependencies import get_user_by_id, get_user_by_username
+from src.settings import auth_settings, redis_settings
+from src.dependencies import get_db_session, get_user_by_id
 
 from src.integrations.schemas import AuthEvent, BotRegistrationEvent, EventType
 from src.integrations.redis import redis_service
@@ -26,7 +28,14 @@ from src.auth.schemas import (
 
 from src.db.models.student import Student
 from src.db.models.teacher import Teacher
-from src.db.models.token import Token, TokenType
+from src.db.models.token import TokenType
+from src.db.models.user_session import UserSession
+from src.db.maintenance import delete_expired
+from src.auth.identity import get_user_identity
+from src.auth.token_store import hash_confirmation_code, token_store
+from src.teacher.audience import bump_audience_version
+
+logger = logging.getLogger(__name__)
 
 
 async def create_registration_token(
@@ -36,20 +45,9 @@ async def create_registration_token(
     """Создание токена регистрации"""
     raw_token = secrets.token_urlsafe(32)
 
-    # Хэшируем токен для хранения в БД
+    # Хэшируем токен для хранения
     hashed_value = hashlib.sha256(raw_token.encode()).hexdigest()
-
-    token = Token(
-        value=hashed_value,
-        type=TokenType.REGISTRATION,
-        user_id=user_id,
-        expires_at=datetime.now(timezone.utc) + timedelta(minutes=3),
-        used=False,
-    )
-
-    session.add(token)
-    await session.commit()
-    await session.refresh(token)
+    await token_store.save(hashed_value, TokenType.REGISTRATION, user_id, session)
 
     return raw_token
 
@@ -58,74 +56,21 @@ async def create_confirmation_token(
     session: AsyncSession
 ) -> str:
     """Создание токена подтверждения"""
-    # 1. Генерируем 6-значный код подтверждения
-    raw_code = f"{secrets.randbelow(1000000):06}"
-
-    # 2. Хэшируем код и сохраняем в Token
-    hashed_value = hashlib.sha256(raw_code.encode()).hexdigest()
-    token = Token(
-        value=hashed_value,
-        type=TokenType.CONFIRMATION,
-        user_id=user_id,
-        expires_at=datetime.now(timezone.utc) + timedelta(minutes=3),
-        used=False,
-    )
+    while True:
+        # 1. Генерируем 6-значный код подтверждения
+        raw_code = f"{secrets.randbelow(1000000):06}"
 
-    session.add(token)
-    await session.commit()
-    await session.refresh(token)
-
-    return raw_code
+        # 2. Хэшируем код вместе с ID пользователя и сохраняем
+        #    (при совпадении с еще действующим кодом генерируем новый)
+        hashed_value = hash_confirmation_code(user_id, raw_code)
+        if await token_store.save(hashed_value, TokenType.CONFIRMATION, user_id, session):
+            return raw_code
 
 
 async def verify_token(data: VerifySchema, session: AsyncSession) -> int:
-    """Проверка токена"""
-    # 1. Хэшируем токен для поиска в БД
+    """Проверка токена (токен одноразовый и удаляется после проверки)"""
     hashed_value = hashlib.sha256(data.token.encode()).hexdigest()
-
-    # 2. Получаем токен из БД
-    result = await session.execute(
-        select(Token).where(Token.value == hashed_value, Token.type == data.token_type)
-    )
-    token = result.scalar_one_or_none()
-
-    # 3. Проверяем, что токен найден
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=(
-                "Неверный токен"
-                if data.token_type == TokenType.REGISTRATION
-                else "Неверный код подтверждения"
-            ),
-        )
-    # 4. Проверяем, не использован ли токен
-    if token.used:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=(
-                "Токен уже использован"
-                if data.token_type == TokenType.REGISTRATION
-                else "Код подтверждения уже использован"
-            ),
-        )
-
-    # 5. Проверяем срок действия
-    if token.expires_at < datetime.now(timezone.utc):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=(
-                "Токен истёк"
-                if data.token_type == TokenType.REGISTRATION
-                else "Код подтверждения истёк"
-            ),
-        )
-
-    # 6. Помечаем токен как использованный
-    token.used = True
-    await session.commit()
-
-    return token.user_id
+    return await token_store.consume(hashed_value, data.token_type, session)
 
 
 async def register_user(
@@ -167,19 +112,100 @@ async def register_user(
     return RegisterResponse(token=await create_registration_token(user.id, session))
 
 
-async def update_refresh_id(user_id: int, refresh_id: str, session: AsyncSession) -> None:
-    """Обновление refresh_id токена пользователя"""
-    user = await get_user_by_id(user_id, session)
-    user.refresh_id = refresh_id
+async def start_user_session(
+    user_id: int,
+    role: str,
+    refresh_id: str,
+    ip: str,
+    session: AsyncSession
+) -> None:
+    """Создание сессии пользователя при входе"""
+    now = datetime.now(timezone.utc)
+    session.add(UserSession(
+        jti=refresh_id,
+        user_id=user_id,
+        role=role,
+        ip=ip,
+        created_at=now,
+        expires_at=now + auth_settings.JWT_REFRESH_TOKEN_EXPIRES,
+    ))
     await session.commit()
 
 
-async def update_ip(user_id: int, ip: str, session: AsyncSession) -> None:
-    """Обновление IP адреса пользователя"""
-    user = await get_user_by_id(user_id, session)
-    user.ip = ip
+async def rotate_user_session(
+    user_id: int,
+    ip: str,
+    refresh_id: str,
+    new_refresh_id: str,
+    session: AsyncSession
+) -> str:
+    """Проверка refresh_id и IP и замена refresh_id одним UPDATE
+
+    Returns:
+        Роль пользователя
+    """
+    now = datetime.now(timezone.utc)
+    role = await session.scalar(
+        update(UserSession)
+        .where(
+            UserSession.jti == refresh_id,
+            UserSession.user_id == user_id,
+            UserSession.ip == ip,
+            UserSession.expires_at > now
+        )
+        .values(jti=new_refresh_id, expires_at=now + auth_settings.JWT_REFRESH_TOKEN_EXPIRES)
+        .returning(UserSession.role)
+    )
+    await session.commit()
+
+    if role is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Сессия недействительна"
+        )
+    return role
+
+
+async def end_user_session(refresh_id: str, session: AsyncSession) -> None:
+    """Завершение сессии при выходе"""
+    await session.execute(delete(UserSession).where(UserSession.jti == refresh_id))
     await session.commit()
 
+
+async def revoke_user_sessions(user_id: int, session: AsyncSession) -> None:
+    """Удаление всех сессий пользователя (без коммита)"""
+    await session.execute(delete(UserSession).where(UserSession.user_id == user_id))
+
+
+async def purge_expired_sessions(session: AsyncSession, batch_size: int) -> int:
+    """Удаление истекших сессий пачками
+
+    Returns:
+        Количество удаленных сессий
+    """
+    return await delete_expired(session, UserSession, UserSession.expires_at, batch_size)
+
+
+async def run_sessions_purge() -> None:
+    """Периодическая очистка истекших сессий и токенов"""
+    while True:
+        try:
+            async with get_db_session() as session:
+                deleted = await purge_expired_sessions(
+                    session, auth_settings.SESSION_PURGE_BATCH_SIZE
+                )
+                deleted_tokens = await token_store.purge_expired(
+                    session, auth_settings.SESSION_PURGE_BATCH_SIZE
+                )
+            if deleted or deleted_tokens:
+                logger.info(
+                    "Удалено истекших сессий: %s, токенов: %s", deleted, deleted_tokens
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Ошибка очистки сессий: %s", e)
+        await asyncio.sleep(auth_settings.SESSION_PURGE_INTERVAL)
+
+
 async def set_user_telegram(
     user_id: int,
     data: BotRegistrationEvent,
@@ -193,15 +219,36 @@ async def set_user_telegram(
     user.telegram_username = data.username
 
     await session.commit()
+    if isinstance(user, Teacher):
+        await bump_audience_version()
+
+
+async def find_user_by_username(username: str, session: AsyncSession) -> tuple[int, int | None]:
+    """Поиск пользователя по username в Telegram
+
+    Returns:
+        ID и Telegram ID пользователя
+    """
+    row = (await session.execute(
+        union_all(
+            select(Student.id, Student.telegram_id)
+            .where(Student.telegram_username == username),
+            select(Teacher.id, Teacher.telegram_id)
+            .where(Teacher.telegram_username == username),
+        ).limit(1)
+    )).one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пользователь не найден"
+        )
+    return row[0], row[1]
 
 
 async def login_user(data: LoginRequest, session: AsyncSession) -> None:
     """Авторизация пользователя"""
-    user = await get_user_by_username(data.username, session)
-
-    await create_confirmation_token(user.id, session)
-
-    if user.telegram_id is None:
+    user_id, telegram_id = await find_user_by_username(data.username, session)
+    if telegram_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Telegram ID пользователя не найден"
@@ -209,8 +256,8 @@ async def login_user(data: LoginRequest, session: AsyncSession) -> None:
 
     auth_event = AuthEvent(
         event_type=EventType.AUTH,
-        user_id=user.telegram_id,
-        code=await create_confirmation_token(user.id, session),
+        user_id=telegram_id,
+        code=await create_confirmation_token(user_id, session),
     )
     await redis_service.xadd(
             redis_settings.STREAM_FROM_BACKEND,
@@ -219,25 +266,24 @@ async def login_user(data: LoginRequest, session: AsyncSession) -> None:
 
 
 async def login_verify_user(data: LoginVerifySchema, session: AsyncSession) -> tuple[int, str]:
-    """Проверка кода подтверждения и вход в систему"""
-    user_id = await verify_token(
-        VerifySchema(
-            token=data.token,
-            token_type=TokenType.CONFIRMATION
-        ),
-        session
+    """Проверка кода подтверждения
+
+    Код принимается, только если он выдан пользователю с указанным username.
+
+    Returns:
+        ID и роль пользователя
+    """
+    user_id, _ = await find_user_by_username(data.username, session)
+    await token_store.consume(
+        hash_confirmation_code(user_id, data.token),
+        TokenType.CONFIRMATION,
+        session,
+        user_id
     )
-    user = await get_user_by_id(user_id, session)
-    if isinstance(user, Student):
-        return user_id, "student"
-    return user_id, "teacher"
-
-
-async def check_user_refresh(user_id: int, ip: str, refresh_id: str, session: AsyncSession) -> None:
-    """Проверка refresh_id и IP"""
-    user = await get_user_by_id(user_id, session)
-    if user.refresh_id != refresh_id or user.ip != ip:
+    identity = await get_user_identity(user_id, session)
+    if identity.is_deleted:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Сессия недействительна"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пользователь не найден"
         )
+    return user_id, identity.role
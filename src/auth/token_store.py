@@ -0,0 +1,218 @@
+"""Хранилища одноразовых токенов (регистрация и коды подтверждения)
+
+В хранилище попадает только хэш токена. Коды подтверждения короткие и могут
+совпадать у разных пользователей, поэтому хэш кода считается вместе с ID
+пользователя (см. hash_confirmation_code), а при проверке кода указывается
+ID пользователя, которому он выдан.
+    - RedisTokenStore: TTL средствами Redis, одноразовость через GETDEL
+    - SqlTokenStore: таблица tokens, используется как запасной вариант
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.maintenance import delete_expired
+from src.db.models.token import Token, TokenType
+from src.integrations.redis import redis_service
+from src.settings import auth_settings
+
+logger = logging.getLogger(__name__)
+
+# Время жизни токенов регистрации и кодов подтверждения
+TOKEN_TTL = timedelta(minutes=3)
+
+
+def hash_confirmation_code(user_id: int, code: str) -> str:
+    """Хэш кода подтверждения, привязанный к пользователю"""
+    return hashlib.sha256(f"{user_id}:{code}".encode()).hexdigest()
+
+
+def token_error(token_type: TokenType, reason: str) -> HTTPException:
+    """Ошибка проверки токена с текстом в зависимости от типа токена"""
+    messages = {
+        "invalid": ("Неверный токен", "Неверный код подтверждения"),
+        "expired": ("Токен истёк", "Код подтверждения истёк"),
+    }
+    registration, confirmation = messages[reason]
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=registration if token_type == TokenType.REGISTRATION else confirmation,
+    )
+
+
+class SqlTokenStore:
+    """Хранение токенов в таблице tokens"""
+
+    async def save(
+        self,
+        hashed_value: str,
+        token_type: TokenType,
+        user_id: int,
+        session: AsyncSession
+    ) -> bool:
+        """Сохранение токена
+
+        Returns:
+            True, если токен сохранен (False - токен с таким значением уже есть)
+        """
+        session.add(Token(
+            value=hashed_value,
+            type=token_type,
+            user_id=user_id,
+            expires_at=datetime.now(timezone.utc) + TOKEN_TTL,
+        ))
+        await session.commit()
+        return True
+
+    async def consume(
+        self,
+        hashed_value: str,
+        token_type: TokenType,
+        session: AsyncSession,
+        user_id: int | None = None
+    ) -> int:
+        """Проверка и удаление токена (одноразовое использование)
+
+        Args:
+            user_id: ID пользователя, которому выдан токен (если известен)
+
+        Returns:
+            ID пользователя
+        """
+        conditions = [Token.value == hashed_value, Token.type == token_type]
+        if user_id is not None:
+            conditions.append(Token.user_id == user_id)
+        row = (await session.execute(
+            delete(Token)
+            .where(*conditions)
+            .returning(Token.user_id, Token.expires_at)
+        )).first()
+        await session.commit()
+
+        if row is None:
+            raise token_error(token_type, "invalid")
+
+        token_user_id, expires_at = row
+        if expires_at < datetime.now(timezone.utc):
+            raise token_error(token_type, "expired")
+        return token_user_id
+
+    async def delete_user_tokens(self, user_id: int, session: AsyncSession) -> None:
+        """Удаление всех токенов пользователя (без коммита)"""
+        await session.execute(delete(Token).where(Token.user_id == user_id))
+
+    async def purge_expired(self, session: AsyncSession, batch_size: int) -> int:
+        """Удаление истекших неиспользованных токенов пачками
+
+        Returns:
+            Количество удаленных токенов
+        """
+        return await delete_expired(session, Token, Token.expires_at, batch_size)
+
+
+class RedisTokenStore:
+    """Хранение токенов в Redis с запасным SQL-хранилищем"""
+
+    def __init__(self, fallback: SqlTokenStore, prefix: str = "token"):
+        """Инициализация хранилища
+
+        Args:
+            fallback: Хранилище, используемое при недоступности Redis
+            prefix: Префикс ключей в Redis
+        """
+        self.fallback = fallback
+        self.prefix = prefix
+
+    def _key(self, hashed_value: str, token_type: TokenType) -> str:
+        """Ключ токена"""
+        return f"{self.prefix}:{token_type.value}:{hashed_value}"
+
+    def _user_key(self, user_id: int) -> str:
+        """Ключ множества токенов пользователя"""
+        return f"{self.prefix}:user:{user_id}"
+
+    async def save(
+        self,
+        hashed_value: str,
+        token_type: TokenType,
+        user_id: int,
+        session: AsyncSession
+    ) -> bool:
+        """Сохранение токена с TTL (существующий токен не перезаписывается)
+
+        Returns:
+            True, если токен сохранен (False - токен с таким значением уже есть)
+        """
+        key = self._key(hashed_value, token_type)
+        user_key = self._user_key(user_id)
+        try:
+            async with redis_service.redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(key, user_id, ex=TOKEN_TTL, nx=True)
+                pipe.sadd(user_key, key)
+                pipe.expire(user_key, TOKEN_TTL)
+                saved, *_ = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Redis недоступен, токен сохранен в БД: %s", e)
+            return await self.fallback.save(hashed_value, token_type, user_id, session)
+        return bool(saved)
+
+    async def consume(
+        self,
+        hashed_value: str,
+        token_type: TokenType,
+        session: AsyncSession,
+        user_id: int | None = None
+    ) -> int:
+        """Атомарное получение и удаление токена
+
+        Args:
+            user_id: ID пользователя, которому выдан токен (если известен)
+
+        Returns:
+            ID пользователя
+        """
+        try:
+            raw = await redis_service.getdel(self._key(hashed_value, token_type))
+        except RedisError as e:
+            logger.warning("Redis недоступен, токен проверяется в БД: %s", e)
+            return await self.fallback.consume(hashed_value, token_type, session, user_id)
+
+        if raw is None:
+            # Токен мог быть сохранен в БД, пока Redis был недоступен
+            return await self.fallback.consume(hashed_value, token_type, session, user_id)
+        if user_id is not None and int(raw) != user_id:
+            raise token_error(token_type, "invalid")
+        return int(raw)
+
+    async def delete_user_tokens(self, user_id: int, session: AsyncSession) -> None:
+        """Удаление всех токенов пользователя"""
+        user_key = self._user_key(user_id)
+        try:
+            keys = await redis_service.redis_client.smembers(user_key)
+            await redis_service.delete(user_key, *(k.decode() for k in keys))
+        except RedisError as e:
+            logger.warning("Не удалось удалить токены пользователя из Redis: %s", e)
+        await self.fallback.delete_user_tokens(user_id, session)
+
+    async def purge_expired(self, session: AsyncSession, batch_size: int) -> int:
+        """Удаление истекших токенов из запасного хранилища (в Redis они истекают по TTL)"""
+        return await self.fallback.purge_expired(session, batch_size)
+
+
+def get_token_store() -> SqlTokenStore | RedisTokenStore:
+    """Хранилище токенов согласно настройкам"""
+    sql_store = SqlTokenStore()
+    stores: dict[str, SqlTokenStore | RedisTokenStore] = {
+        "sql": sql_store,
+        "redis": RedisTokenStore(fallback=sql_store),
+    }
+    return stores[auth_settings.TOKEN_STORE]
+
+
+token_store = get_token_store()
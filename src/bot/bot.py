@@ -8,12 +8,14 @@ from typing import Union
 from aiogram import F, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
 from aiogram.filters import Command, CommandObject
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from src.integrations.schemas import (
     BotCommonStart,
     BotReviewResponse,
+    BroadcastEvent,
     EventType,
     BotRegistrationEvent,
     AuthEvent,
@@ -21,7 +23,7 @@ from src.integrations.schemas import (
     RegistrationResponseEvent,
     ReviewEvent,
 )
-from src.integrations.redis import RedisService, read_stream_messages
+from src.integrations.redis import RedisService, read_stream_messages, stream_cursor_key
 from src.settings import redis_settings, bot_settings
 
 logging.basicConfig(level=logging.INFO)
@@ -68,10 +70,17 @@ async def listen_backend_events():
                 elif event_type == EventType.NOTIFICATION:
                     event = NotificationEvent(**payload)
                     await handle_notification_event(event)
+                elif event_type == EventType.BROADCAST:
+                    event = BroadcastEvent(**payload)
+                    await handle_broadcast_event(event)
                 elif event_type == EventType.REVIEW:
                     event = ReviewEvent(**payload)
                     await handle_review_event(event)
 
+            # Позиция бота в stream (по ней бэкенд определяет отставание)
+            if messages:
+                await redis_service.set(stream_cursor_key(redis_settings.STREAM_FROM_BACKEND), last_id)
+
             await asyncio.sleep(2)
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("БОТ: Ошибка прослушивания Redis: %s", e)
@@ -88,6 +97,38 @@ async def handle_notification_event(event: NotificationEvent):
     await bot.send_message(chat_id=event.user_id, text=event.message)
 
 
+async def send_with_retry(user_id: int, text: str) -> None:
+    """Отправка сообщения с повтором после ограничения частоты (RetryAfter)"""
+    for attempt in range(bot_settings.BOT_SEND_RETRIES + 1):
+        try:
+            await bot.send_message(chat_id=user_id, text=text)
+            return
+        except TelegramRetryAfter as e:
+            if attempt == bot_settings.BOT_SEND_RETRIES:
+                raise
+            logger.warning("БОТ: Ограничение частоты, повтор через %s с", e.retry_after)
+            await asyncio.sleep(e.retry_after)
+
+
+async def handle_broadcast_event(event: BroadcastEvent):
+    """Отправка одного уведомления нескольким пользователям
+
+    Сообщения отправляются не чаще BOT_SEND_RATE в секунду.
+    """
+    loop = asyncio.get_running_loop()
+    interval = 1 / bot_settings.BOT_SEND_RATE
+    next_send = loop.time()
+    for user_id in event.user_ids:
+        delay = next_send - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await send_with_retry(user_id, event.message)
+        except TelegramAPIError as e:
+            logger.warning("БОТ: Не удалось отправить уведомление %s: %s", user_id, e)
+        next_send = max(next_send + interval, loop.time())
+
+
 async def handle_review_event(event: ReviewEvent):
     """Отправка уведомления пользователю о новом отзыве"""
     await bot.send_message(
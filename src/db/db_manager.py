@@ -1,27 +1,215 @@
 """Модуль взаимодействия с базой данных."""
 
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
 from functools import lru_cache
+from typing import Any, AsyncIterator, Sequence, cast
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+from src.db.instrumentation import SlowQueryLog, instrument_engine
 from src.settings import db_settings
 
+
+class PoolStats:
+    """Статистика пула соединений"""
+
+    def __init__(self):
+        """Инициализация счетчиков"""
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        """Учет времени ожидания соединения"""
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self, pool: Any) -> dict[str, Any]:
+        """Текущее состояние пула и накопленные счетчики"""
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class MonitoredPool(AsyncAdaptedQueuePool):
+    """Пул соединений с учетом времени ожидания свободного соединения"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Инициализация пула со статистикой"""
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "MonitoredPool":
+        """Пересоздание пула (engine.dispose) с сохранением статистики"""
+        pool = cast(MonitoredPool, super().recreate())
+        pool.stats = self.stats
+        return pool
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        """Создание нового физического соединения"""
+        self.stats.connects += 1
+        return super()._create_connection()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """Получение соединения из пула"""
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return entry
+
+
+# Отставание реплики в секундах (0, если все полученные изменения применены)
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END::float"
+)
+
+
+class Replica:
+    """Реплика базы данных для чтения"""
+
+    def __init__(self, url: str, **engine_options: Any):
+        """Инициализирует подключение к реплике.
+
+        Args:
+            url: URL для подключения к реплике
+            engine_options: Параметры пула и драйвера
+        """
+        self.engine = create_async_engine(url=url, poolclass=MonitoredPool, **engine_options)
+        instrument_engine(self.engine)
+        self.session_factory = async_sessionmaker(
+            bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False
+        )
+        self.lag: float | None = None
+        self.healthy = True
+
+    async def check_lag(self, max_lag: float) -> None:
+        """Проверка отставания реплики от основной базы"""
+        try:
+            async with self.engine.connect() as connection:
+                self.lag = (await connection.execute(REPLICA_LAG_QUERY)).scalar_one()
+        except (SQLAlchemyError, OSError):
+            self.lag = None
+            self.healthy = False
+            return
+        self.healthy = self.lag is not None and self.lag <= max_lag
+
+
 class DatabaseManager:
     """Вспомогательный класс для работы с базой данных."""
 
-    def __init__(self, url: str, echo: bool = False):
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        replica_urls: Sequence[str] = (),
+        slow_query_log: SlowQueryLog | None = None,
+        **engine_options: Any
+    ):
         """Инициализирует подключение к базе данных.
 
         Args:
             url: URL для подключения к базе данных
             echo: Флаг для вывода SQL-запросов в консоль
+            replica_urls: URL реплик для чтения
+            slow_query_log: Журнал медленных запросов (None - отключен)
+            engine_options: Параметры пула и драйвера (см. DatabaseSettings.get_engine_options)
         """
-        self.engine = create_async_engine(url=url, echo=echo, pool_pre_ping=True)
+        self.engine = create_async_engine(
+            url=url, echo=echo, poolclass=MonitoredPool, **engine_options
+        )
+        self.slow_query_log = slow_query_log
+        instrument_engine(self.engine, slow_query_log)
         self.session_factory = async_sessionmaker(
             bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False
         )
+        self.replicas = [Replica(replica_url, **engine_options) for replica_url in replica_urls]
+        self._replica_counter = itertools.count()
+
+    @property
+    def pool(self) -> MonitoredPool:
+        """Текущий пул соединений"""
+        return self.engine.sync_engine.pool  # type: ignore[return-value]
+
+    def get_read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Фабрика сессий для чтения: исправная реплика по кругу или основная база"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return self.session_factory
+        return healthy[next(self._replica_counter) % len(healthy)].session_factory
+
+    @asynccontextmanager
+    async def primary_session(self, session: AsyncSession) -> AsyncIterator[AsyncSession]:
+        """Сессия основной базы: переданная, если она подключена к основной базе, иначе новая"""
+        if session.bind is self.engine:
+            yield session
+            return
+        async with self.session_factory() as primary:
+            yield primary
+
+    async def monitor_replicas(self, interval: float, max_lag: float) -> None:
+        """Периодическая проверка отставания реплик"""
+        while True:
+            for replica in self.replicas:
+                await replica.check_lag(max_lag)
+            await asyncio.sleep(interval)
+
+    def get_pool_stats(self) -> dict[str, Any]:
+        """Статистика пула соединений для мониторинга"""
+        return self.pool.stats.snapshot(self.pool)
+
+    def get_slow_queries(self) -> list[dict[str, Any]]:
+        """Записи журнала медленных запросов"""
+        if self.slow_query_log is None:
+            return []
+        return self.slow_query_log.get_entries()
+
+    def get_replica_stats(self) -> list[dict[str, Any]]:
+        """Состояние реплик для мониторинга"""
+        return [
+            {
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "pool": replica.engine.sync_engine.pool.stats.snapshot(  # type: ignore[attr-defined]
+                    replica.engine.sync_engine.pool
+                ),
+            }
+            for replica in self.replicas
+        ]
 
 
 @lru_cache()
 def get_database_manager() -> DatabaseManager:
     """Получение менеджера базы данных."""
-    return DatabaseManager(url=db_settings.get_db_url())
+    return DatabaseManager(
+        url=db_settings.get_db_url(),
+        replica_urls=db_settings.get_replica_urls(),
+        slow_query_log=SlowQueryLog(
+            threshold_ms=db_settings.DB_SLOW_QUERY_THRESHOLD,
+            explain_every=db_settings.DB_SLOW_QUERY_EXPLAIN_EVERY,
+            max_size=db_settings.DB_SLOW_QUERY_LOG_SIZE,
+        ) if db_settings.DB_SLOW_QUERY_LOG else None,
+        **db_settings.get_engine_options()
+    )
@@ -0,0 +1,186 @@
+"""Учет SQL-запросов в рамках HTTP-запроса
+
+Обработчики событий движка считают количество запросов и суммарное время их
+выполнения. Счетчики текущего HTTP-запроса хранятся в contextvars, поэтому
+запросы из фоновых задач в статистику запроса не попадают.
+
+Журнал медленных запросов (опционально) сохраняет запросы дольше порога
+вместе с типами параметров (без значений) и планом выполнения для части из них.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Запросы, для которых строится план
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class QueryStats:
+    """Счетчики SQL-запросов одного HTTP-запроса"""
+
+    def __init__(self, path: str | None = None):
+        """Инициализация счетчиков
+
+        Args:
+            path: Путь HTTP-запроса
+        """
+        self.path = path
+        self.count = 0
+        self.duration = 0.0
+
+    def record(self, duration: float) -> None:
+        """Учет выполненного запроса"""
+        self.count += 1
+        self.duration += duration
+
+    @property
+    def duration_ms(self) -> float:
+        """Суммарное время запросов в миллисекундах"""
+        return round(self.duration * 1000, 3)
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats(path: str | None = None) -> QueryStats:
+    """Начало учета запросов для текущего контекста"""
+    stats = QueryStats(path)
+    query_stats.set(stats)
+    return stats
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """Типы параметров запроса без значений"""
+    if isinstance(parameters, dict):
+        return {key: parameters_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [
+            f"{type(value).__name__}[{len(value)}]" if isinstance(value, (list, tuple))
+            else type(value).__name__
+            for value in parameters
+        ]
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Журнал медленных запросов с ограниченным размером"""
+
+    def __init__(self, threshold_ms: float, explain_every: int, max_size: int):
+        """Инициализация журнала
+
+        Args:
+            threshold_ms: Порог длительности запроса (миллисекунды)
+            explain_every: План строится для каждого N-го медленного запроса (0 - не строится)
+            max_size: Максимальное количество записей
+        """
+        self.threshold = threshold_ms / 1000
+        self.explain_every = explain_every
+        self.entries: deque[dict[str, Any]] = deque(maxlen=max_size)
+        self._counter = itertools.count(1)
+        self._tasks: set[asyncio.Task] = set()
+
+    def observe(self, engine: AsyncEngine, statement: str, parameters: Any, duration: float) -> None:
+        """Учет выполненного запроса"""
+        if duration < self.threshold or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        stats = query_stats.get()
+        entry: dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "path": stats.path if stats is not None else None,
+            "duration_ms": round(duration * 1000, 3),
+            "statement": " ".join(statement.split()),
+            "parameters": parameters_shape(parameters),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        logger.warning("Медленный запрос (%sms): %s", entry["duration_ms"], entry["statement"])
+
+        explainable = entry["statement"].upper().startswith(EXPLAINABLE)
+        if explainable and self.explain_every and next(self._counter) % self.explain_every == 0:
+            task = asyncio.get_running_loop().create_task(
+                self._explain(engine, entry, statement, parameters)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _explain(
+        self,
+        engine: AsyncEngine,
+        entry: dict[str, Any],
+        statement: str,
+        parameters: Any
+    ) -> None:
+        """Построение плана запроса (без выполнения) на отдельном соединении"""
+        try:
+            async with engine.connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters
+                )
+                raw = result.scalar_one()
+        except SQLAlchemyError as e:
+            logger.warning("Не удалось построить план медленного запроса: %s", e)
+            return
+        entry["plan"] = json.loads(raw) if isinstance(raw, str) else raw
+
+    def get_entries(self) -> list[dict[str, Any]]:
+        """Записи журнала, начиная с последней"""
+        return list(reversed(self.entries))
+
+
+def _before_cursor_execute(conn: Any, *_args: Any) -> None:
+    """Запоминание времени начала запроса"""
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _finish_query(conn: Any) -> float:
+    """Учет времени выполнения запроса
+
+    Returns:
+        Длительность запроса в секундах
+    """
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(duration)
+    return duration
+
+
+def _handle_error(context: Any) -> None:
+    """Учет запроса, завершившегося ошибкой"""
+    if context.connection is not None and context.connection.info.get("query_start"):
+        _finish_query(context.connection)
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_log: SlowQueryLog | None = None) -> None:
+    """Подключение учета запросов (и журнала медленных запросов) к движку"""
+
+    def after_cursor_execute(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        _context: Any,
+        _executemany: bool
+    ) -> None:
+        """Учет выполненного запроса"""
+        duration = _finish_query(conn)
+        if slow_query_log is not None:
+            slow_query_log.observe(engine, statement, parameters, duration)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,37 @@
+"""Служебные операции с таблицами"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.db.models.base import Base
+
+
+async def delete_expired(
+    session: AsyncSession,
+    model: type[Base],
+    expires_at: InstrumentedAttribute[datetime],
+    batch_size: int
+) -> int:
+    """Удаление строк с истекшим сроком (expires_at < now) пачками, каждая в своей транзакции
+
+    Returns:
+        Количество удаленных строк
+    """
+    total = 0
+    while True:
+        expired_ids = (
+            select(model.id)
+            .where(expires_at < datetime.now(timezone.utc))
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await session.execute(delete(model).where(model.id.in_(expired_ids)))
+        await session.commit()
+
+        deleted = result.rowcount  # type: ignore[attr-defined]
+        total += deleted
+        if deleted < batch_size:
+            return total
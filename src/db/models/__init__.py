@@ -3,12 +3,14 @@
 from .base import Base
 
 from .application import Application
+from .application_feed import ApplicationFeed
 from .matches import Match
 from .review import Review
 from .student import Student
 from .subject import Subject
 from .teacher import Teacher
 from .token import Token
+from .user_session import UserSession
 
 from .association_tables import (
     hidden_applications,
@@ -18,12 +20,14 @@ from .association_tables import (
 __all__ = [
     "Base",
     "Application",
+    "ApplicationFeed",
     "Match",
     "Review",
     "Student",
     "Subject",
     "Teacher",
     "Token",
+    "UserSession",
     "hidden_applications",
     "hidden_teachers",
 ]
@@ -3,7 +3,7 @@
 from enum import Enum
 
 from datetime import datetime
-from sqlalchemy import ForeignKey, DateTime, Integer, String
+from sqlalchemy import ForeignKey, DateTime, Index, Integer, String
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -57,3 +57,31 @@ class Application(Base):
         SQLEnum(ApplicationStatus, native_enum=False),
         nullable=False,
         comment="Статус заявки")
+
+
+# Лента заявок: WHERE status = ... ORDER BY price DESC, created_at DESC, id DESC
+Index(
+    "ix_applications_status_price_created_at_id",
+    Application.status,
+    Application.price.desc(),
+    Application.created_at.desc(),
+    Application.id.desc(),
+)
+# Заявки ученика: WHERE student_id = ... ORDER BY created_at DESC
+Index(
+    "ix_applications_student_id_created_at",
+    Application.student_id,
+    Application.created_at.desc(),
+)
+# Архивация устаревших активных заявок
+Index(
+    "ix_applications_created_at_active",
+    Application.created_at,
+    postgresql_where=Application.status == ApplicationStatus.ACTIVE,
+)
+# Фильтр ленты по предмету
+Index(
+    "ix_applications_subject_id_status",
+    Application.subject_id,
+    Application.status,
+)
@@ -0,0 +1,85 @@
+"""Описание таблицы ленты заявок в БД
+
+Денормализованная копия активных заявок с названием предмета и возрастом ученика.
+Обновляется при изменении заявок, лента читается без соединений с другими таблицами.
+"""
+
+from datetime import datetime
+from sqlalchemy import BigInteger, Computed, ForeignKey, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models.application import LessonsCount
+from src.db.models.base import Base
+
+# Конфигурация полнотекстового поиска
+SEARCH_CONFIG = "russian"
+
+
+class ApplicationFeed(Base):
+    """Модель записи ленты заявок"""
+
+    id: Mapped[int] = mapped_column(
+        ForeignKey("applications.id", ondelete="CASCADE"),
+        primary_key=True,
+        autoincrement=False,
+        comment="ID заявки")
+
+    subject_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="ID предмета")
+
+    subject_name: Mapped[str] = mapped_column(
+        String(50), nullable=False, comment="Название предмета")
+
+    price: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="Цена за час")
+
+    student_id: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, comment="ID ученика")
+
+    student_age: Mapped[int | None] = mapped_column(
+        Integer, nullable=True, comment="Возраст ученика")
+
+    lessons_count: Mapped[LessonsCount] = mapped_column(
+        SQLEnum(LessonsCount, native_enum=False),
+        nullable=False,
+        comment="Предполагаемое количество уроков")
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, comment="Дата создания")
+
+    description: Mapped[str] = mapped_column(
+        String(200), nullable=False, comment="Описание")
+
+    # Поисковый вектор описания (вычисляется базой данных)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', description)", persisted=True),
+        deferred=True,
+        comment="Поисковый вектор описания")
+
+
+# Лента: ORDER BY price DESC, created_at DESC, id DESC
+Index(
+    "ix_applicationfeeds_price_created_at_id",
+    ApplicationFeed.price.desc(),
+    ApplicationFeed.created_at.desc(),
+    ApplicationFeed.id.desc(),
+)
+# Лента с фильтром по предметам
+Index(
+    "ix_applicationfeeds_subject_name_price_created_at_id",
+    ApplicationFeed.subject_name,
+    ApplicationFeed.price.desc(),
+    ApplicationFeed.created_at.desc(),
+    ApplicationFeed.id.desc(),
+)
+# Полнотекстовый поиск по описанию
+Index(
+    "ix_applicationfeeds_search_vector",
+    ApplicationFeed.search_vector,
+    postgresql_using="gin",
+)
+# Обновление возраста ученика
+Index("ix_applicationfeeds_student_id", ApplicationFeed.student_id)
@@ -1,6 +1,6 @@
 """Промежуточные таблицы для связи Many-to-Many"""
 
-from sqlalchemy import Table, Column, ForeignKey
+from sqlalchemy import Table, Column, ForeignKey, Index
 from src.db.models.base import Base
 
 # Репетитор-Предмет
@@ -13,6 +13,8 @@ teacher_subjects = Table(
     Column("subject_id",
             ForeignKey("subjects.id", ondelete="CASCADE"),
             primary_key=True),
+    # Поиск репетиторов по предмету (PK начинается с teacher_id)
+    Index("ix_teacher_subjects_subject_id", "subject_id", "teacher_id"),
 )
 
 # Скрытые заявки
@@ -25,6 +27,7 @@ hidden_applications = Table(
     Column("application_id",
             ForeignKey("applications.id", ondelete="CASCADE"),
             primary_key=True),
+    Index("ix_hidden_applications_application_id", "application_id"),
 )
 
 # Скрытые репетиторы
@@ -38,14 +38,11 @@ class PersonCommon:
     bio: Mapped[str | None] = mapped_column(
         String(200), nullable=True, comment="Описание профиля")
 
-    # Авторизация
-    refresh_id: Mapped[str | None] = mapped_column(
-        String(255), nullable=True, comment="ID refresh токена")
-    ip: Mapped[str | None] = mapped_column(
-        String(255), nullable=True, comment="IP адрес")
-
     # Настройки профиля
     active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, comment="Активность")
     is_deleted: Mapped[bool] = mapped_column(
         Boolean, nullable=False, comment="Удален или нет")
+    profile_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+        comment="Версия профиля (увеличение отзывает выданные access токены)")
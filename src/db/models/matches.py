@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -18,8 +18,21 @@ class MatchStatus(str, Enum):
     REJECTED = "rejected"  # Отклонено
 
 
+# Статусы секции открытых откликов
+OPEN_MATCH_STATUSES = (MatchStatus.REQUEST, MatchStatus.ACTIVE)
+
+
 class Match(Base):
-    """Модель отклика"""
+    """Модель отклика
+
+    Таблица секционирована по статусу: открытые отклики (REQUEST, ACTIVE)
+    хранятся в секции matchs_open, завершенные (ARCHIVED, REJECTED) - в matchs_closed.
+    Запросы с условием на статус читают только нужную секцию. Статус входит
+    в первичный ключ таблицы (требование Postgres), но не в идентичность ORM.
+    """
+
+    __table_args__ = {"postgresql_partition_by": "LIST (status)"}
+    __mapper_args__ = {"primary_key": ["id"]}
 
     student_id: Mapped[int] = mapped_column(
         ForeignKey("students.id", ondelete="NO ACTION"),
@@ -38,7 +51,7 @@ class Match(Base):
 
     status: Mapped[MatchStatus] = mapped_column(
         SQLEnum(MatchStatus, native_enum=False),
-        nullable=False,
+        primary_key=True,
         comment="Статус")
 
     created_at: Mapped[datetime] = mapped_column(
@@ -46,3 +59,16 @@ class Match(Base):
 
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, comment="Дата обновления")
+
+
+# Отклики репетитора/ученика: WHERE teacher_id/student_id = ... ORDER BY updated_at DESC
+Index("ix_matchs_teacher_id_updated_at", Match.teacher_id, Match.updated_at.desc())
+Index("ix_matchs_student_id_updated_at", Match.student_id, Match.updated_at.desc())
+# Исключение заявок с откликом из ленты и проверка повторного отклика
+Index("ix_matchs_application_id_teacher_id", Match.application_id, Match.teacher_id)
+# Отклонение устаревших откликов
+Index(
+    "ix_matchs_created_at_request",
+    Match.created_at,
+    postgresql_where=Match.status == MatchStatus.REQUEST,
+)
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.models.base import Base
@@ -27,3 +27,9 @@ class Review(Base):
         DateTime(timezone=True), nullable=False, comment="Дата создания")
     is_published: Mapped[bool] = mapped_column(
         Boolean, nullable=False, comment="Опубликован или нет")
+
+
+# Отзывы репетитора: WHERE teacher_id = ... ORDER BY created_at DESC
+Index("ix_reviews_teacher_id_created_at", Review.teacher_id, Review.created_at.desc())
+# Отзывы ученика и проверка наличия отзыва на репетитора
+Index("ix_reviews_student_id_teacher_id", Review.student_id, Review.teacher_id)
@@ -1,6 +1,6 @@
 """Описание таблицы репетитора в БД"""
 
-from sqlalchemy import Integer, String, Numeric, Boolean
+from sqlalchemy import Index, Integer, String, Numeric, Boolean
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.models.base import Base, PersonCommon
@@ -25,3 +25,11 @@ class Teacher(PersonCommon, Base):
         Boolean, nullable=False, comment="Уведомления о принятии откликов")
     archive_lessons_notification: Mapped[bool] = mapped_column(
         Boolean, nullable=False, comment="Уведомления о завершении уроков")
+
+
+# Список активных репетиторов: ORDER BY rating DESC
+Index(
+    "ix_teachers_rating_active",
+    Teacher.rating.desc(),
+    postgresql_where=Teacher.active.is_(True) & Teacher.is_deleted.is_(False),
+)
@@ -7,7 +7,7 @@
 from enum import Enum
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, Boolean, Integer
+from sqlalchemy import String, DateTime, Integer
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -24,7 +24,7 @@ class Token(Base):
     """Модель токена"""
 
     value: Mapped[str] = mapped_column(
-        String(64), nullable=False, comment="Токен")
+        String(64), nullable=False, index=True, comment="Токен")
     type: Mapped[TokenType] = mapped_column(
         SQLEnum(TokenType, native_enum=False),
         nullable=False,
@@ -34,6 +34,5 @@ class Token(Base):
     expires_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
+        index=True,
         comment="Время истечения")
-    used: Mapped[bool] = mapped_column(
-        Boolean, nullable=False, comment="Использован")
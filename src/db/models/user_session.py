@@ -0,0 +1,27 @@
+"""Описание таблицы сессий пользователей в БД
+   Одна запись - один refresh токен (одно устройство)
+"""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.models.base import Base
+
+
+class UserSession(Base):
+    """Модель сессии пользователя"""
+
+    jti: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True, comment="ID refresh токена")
+    user_id: Mapped[int] = mapped_column(  # не FK, т.к. может быть и студентом и репетитором
+        BigInteger, nullable=False, index=True, comment="ID пользователя")
+    role: Mapped[str] = mapped_column(
+        String(20), nullable=False, comment="Роль пользователя")
+    ip: Mapped[str] = mapped_column(
+        String(255), nullable=False, comment="IP адрес")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, comment="Дата создания")
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True, comment="Время истечения")
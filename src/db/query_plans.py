@@ -0,0 +1,335 @@
+"""Проверка планов запросов сервисов
+
+Выполняет основные запросы чтения сервисов на локальной базе, перехватывает
+сгенерированный SQL и строит для него EXPLAIN с выключенным enable_seqscan.
+Если в плане остается последовательное сканирование таблицы, значит для запроса
+нет подходящего индекса - скрипт завершается с кодом 1.
+
+Все изменения (тестовые данные, удаление токенов и т.д.) откатываются.
+Запросы ленты выполняются напрямую, в обход кэша ленты и исключений в Redis:
+иначе при попадании в кэш SQL не выполняется, а тестовые данные попадают в Redis.
+
+Запуск:
+    python -m src.db.query_plans            # с 1000 тестовых пользователей
+    python -m src.db.query_plans --seed 0   # на имеющихся данных
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from src.applications.schemas import ApplicationFilters, StudentApplicationFilters
+from src.applications.service import (
+    encode_feed_cursor,
+    get_application_student,
+    get_user_detail_application,
+    query_feed_facets,
+    query_feed_window,
+    teacher_relevance_score
+)
+from src.applications.exclusions import query_teacher_exclusions
+from src.applications.feed import rebuild_feed
+from src.auth.identity import load_profile_version, load_user_identity
+from src.auth.service import rotate_user_session
+from src.auth.token_store import SqlTokenStore
+from src.db.models.application import Application, ApplicationStatus, LessonsCount
+from src.db.models.association_tables import hidden_applications, teacher_subjects
+from src.db.models.matches import Match, MatchStatus
+from src.db.models.review import Review
+from src.db.models.student import Student
+from src.db.models.subject import Subject
+from src.db.models.teacher import Teacher
+from src.db.models.token import TokenType
+from src.matches.service import get_user_matches
+from src.settings import db_settings, feed_settings
+from src.student.service import get_student_related
+from src.teacher.audience import teacher_audience
+from src.teacher.service import get_all_teachers, get_teacher_related
+
+# Маленькие справочники, которые допустимо читать целиком
+SEQ_SCAN_ALLOWED = {"subjects"}
+
+Scenario = Callable[[dict[str, int], AsyncSession], Awaitable[Any]]
+
+# Размер окна ленты, которое читается при промахе кэша
+FEED_WINDOW_SIZE = feed_settings.FEED_PAGE_SIZE + feed_settings.FEED_CACHE_OVERFETCH
+
+
+async def ranked_feed_window(ids: dict[str, int], session: AsyncSession) -> Any:
+    """Окно ленты по релевантности для репетитора"""
+    score = await teacher_relevance_score(ids["teacher_id"], session)
+    return await query_feed_window(session, ApplicationFilters(), None, FEED_WINDOW_SIZE, score)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "Лента заявок": lambda ids, s: query_feed_window(
+        s, ApplicationFilters(), None, FEED_WINDOW_SIZE
+    ),
+    "Лента заявок с фильтрами": lambda ids, s: query_feed_window(
+        s,
+        ApplicationFilters(subjects="Математика", price_min=500, price_max=2000),
+        None,
+        FEED_WINDOW_SIZE
+    ),
+    "Лента заявок, следующая страница": lambda ids, s: query_feed_window(
+        s, ApplicationFilters(), encode_feed_cursor(Application(
+            id=ids["application_id"], price=1000, created_at=datetime.now(timezone.utc)
+        )), FEED_WINDOW_SIZE
+    ),
+    "Поиск по заявкам": lambda ids, s: query_feed_window(
+        s, ApplicationFilters(q="подготовка к экзамену"), None, FEED_WINDOW_SIZE
+    ),
+    "Лента заявок по релевантности": ranked_feed_window,
+    "Счетчики ленты по фильтрам": lambda ids, s: query_feed_facets(s, ApplicationFilters()),
+    "Исключения ленты репетитора": lambda ids, s: query_teacher_exclusions(ids["teacher_id"], s),
+    "Заявки ученика": lambda ids, s: get_application_student(
+        ids["student_id"], s, StudentApplicationFilters(archived=True)
+    ),
+    "Детальная заявка": lambda ids, s: get_user_detail_application(ids["application_id"], s),
+    "Отклики репетитора": lambda ids, s: get_user_matches(ids["teacher_id"], "teacher", s, True, True),
+    "Отклики ученика": lambda ids, s: get_user_matches(ids["student_id"], "student", s, True, True),
+    "Профиль репетитора": lambda ids, s: get_teacher_related(ids["teacher_id"], s),
+    "Профиль ученика": lambda ids, s: get_student_related(ids["student_id"], s),
+    "Список репетиторов": lambda ids, s: get_all_teachers(s),
+    "Индекс рассылки репетиторам": lambda ids, s: teacher_audience.load(s),
+    "Роль пользователя": lambda ids, s: load_user_identity(ids["teacher_id"], s),
+    "Версия профиля": lambda ids, s: load_profile_version(ids["teacher_id"], s),
+    "Проверка кода подтверждения": lambda ids, s: SqlTokenStore().consume(
+        "0" * 64, TokenType.CONFIRMATION, s
+    ),
+    "Обновление сессии": lambda ids, s: rotate_user_session(
+        ids["teacher_id"], "127.0.0.1", "missing", "missing-new", s
+    ),
+}
+
+
+class StatementCollector:
+    """Перехват SQL-запросов, отправляемых драйверу"""
+
+    def __init__(self):
+        """Инициализация сборщика"""
+        self.enabled = False
+        self.statements: list[tuple[str, Any]] = []
+
+    def __call__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        _conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        _context: Any,
+        executemany: bool
+    ) -> None:
+        """Обработчик события before_cursor_execute"""
+        if self.enabled and not executemany:
+            self.statements.append((statement, parameters))
+
+    def start(self) -> None:
+        """Начало сбора запросов"""
+        self.statements = []
+        self.enabled = True
+
+    def stop(self) -> list[tuple[str, Any]]:
+        """Окончание сбора запросов"""
+        self.enabled = False
+        return self.statements
+
+
+def find_seq_scans(plan: dict[str, Any]) -> list[str]:
+    """Таблицы, которые читаются последовательным сканированием"""
+    found: list[str] = []
+    relation = plan.get("Relation Name", "")
+    if plan.get("Node Type") == "Seq Scan" and relation not in SEQ_SCAN_ALLOWED:
+        found.append(relation)
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def explain(connection: AsyncConnection, statement: str, parameters: Any) -> dict[str, Any]:
+    """План запроса в формате JSON"""
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    raw = result.scalar_one()
+    data = json.loads(raw) if isinstance(raw, str) else raw
+    return data[0]["Plan"]
+
+
+async def seed(session: AsyncSession, count: int) -> None:
+    """Заполнение базы тестовыми данными (в рамках откатываемой транзакции)"""
+    now = datetime.now(timezone.utc)
+    person = {"surname": "Тестов", "name": "Тест", "active": True, "is_deleted": False}
+    subject_ids = list((await session.execute(select(Subject.id))).scalars().all())
+    if not subject_ids:
+        subject_ids = [(await session.execute(
+            insert(Subject).values(name="Математика").returning(Subject.id)
+        )).scalar_one()]
+
+    teacher_ids = list((await session.execute(
+        insert(Teacher).returning(Teacher.id),
+        [
+            {
+                **person,
+                "telegram_username": f"plan_teacher_{i}",
+                "rate": 500 + i % 30 * 50,
+                "rating": i % 50 / 10,
+                "application_notification": True,
+                "review_notification": True,
+                "response_notification": True,
+                "archive_lessons_notification": True,
+            }
+            for i in range(count)
+        ]
+    )).scalars().all())
+    student_ids = list((await session.execute(
+        insert(Student).returning(Student.id),
+        [
+            {
+                **person,
+                "telegram_username": f"plan_student_{i}",
+                "age": 10 + i % 40,
+                "request_notification": True,
+                "review_published_notification": True,
+                "archive_lessons_notification": True,
+            }
+            for i in range(count)
+        ]
+    )).scalars().all())
+
+    await session.execute(insert(teacher_subjects), [
+        {"teacher_id": teacher_id, "subject_id": subject_ids[i % len(subject_ids)]}
+        for i, teacher_id in enumerate(teacher_ids)
+    ])
+
+    statuses = list(ApplicationStatus)
+    lessons = list(LessonsCount)
+    application_ids = list((await session.execute(
+        insert(Application).returning(Application.id),
+        [
+            {
+                "student_id": student_ids[i % count],
+                "subject_id": subject_ids[i % len(subject_ids)],
+                "price": 300 + i % 40 * 50,
+                "lessons_count": lessons[i % len(lessons)],
+                "description": "Тестовая заявка",
+                "created_at": now - timedelta(minutes=i),
+                "status": statuses[i % len(statuses)],
+            }
+            for i in range(count * 5)
+        ]
+    )).scalars().all())
+
+    match_statuses = list(MatchStatus)
+    await session.execute(insert(Match), [
+        {
+            "student_id": student_ids[i % count],
+            "teacher_id": teacher_ids[i % count],
+            "application_id": application_id,
+            "status": match_statuses[i % len(match_statuses)],
+            "created_at": now,
+            "updated_at": now - timedelta(minutes=i),
+        }
+        for i, application_id in enumerate(application_ids[::2])
+    ])
+    await session.execute(insert(hidden_applications), [
+        {"teacher_id": teacher_ids[i % count], "application_id": application_id}
+        for i, application_id in enumerate(application_ids[1::3])
+    ])
+    await session.execute(insert(Review), [
+        {
+            "student_id": student_ids[i % count],
+            "teacher_id": teacher_ids[(i * 7) % count],
+            "rating": 1 + i % 5,
+            "text": "Тестовый отзыв",
+            "created_at": now - timedelta(minutes=i),
+            "is_published": True,
+        }
+        for i in range(count * 2)
+    ])
+    await rebuild_feed(session)
+    await session.execute(text("ANALYZE"))
+
+
+async def pick_ids(session: AsyncSession) -> dict[str, int]:
+    """ID существующих записей для подстановки в запросы"""
+    ids = {
+        "teacher_id": select(Teacher.id).where(Teacher.telegram_username.is_not(None)),
+        "student_id": select(Student.id).where(Student.telegram_username.is_not(None)),
+        "application_id": select(Application.id),
+        "subject_id": select(Subject.id),
+    }
+    return {
+        name: (await session.execute(query.limit(1))).scalar_one_or_none() or 0
+        for name, query in ids.items()
+    }
+
+
+async def check_plans(seed_count: int) -> int:
+    """Выполнение сценариев и проверка планов
+
+    Returns:
+        Количество запросов с последовательным сканированием
+    """
+    engine = create_async_engine(db_settings.get_db_url())
+    collector = StatementCollector()
+    event.listen(engine.sync_engine, "before_cursor_execute", collector)
+    failures = 0
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False
+        )
+        try:
+            if seed_count:
+                await seed(session, seed_count)
+            ids = await pick_ids(session)
+            await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+            for name, scenario in SCENARIOS.items():
+                collector.start()
+                try:
+                    await scenario(ids, session)
+                except HTTPException:
+                    pass
+                statements = collector.stop()
+
+                for statement, parameters in statements:
+                    seq_scans = find_seq_scans(await explain(connection, statement, parameters))
+                    status = "OK" if not seq_scans else f"Seq Scan: {', '.join(seq_scans)}"
+                    print(f"[{name}] {status}")
+                    if seq_scans:
+                        failures += 1
+                        print(f"    {' '.join(statement.split())}")
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+    await engine.dispose()
+    return failures
+
+
+def main() -> None:
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Проверка планов запросов сервисов")
+    parser.add_argument(
+        "--seed", type=int, default=1000,
+        help="Количество тестовых репетиторов и учеников (0 - без тестовых данных)"
+    )
+    args = parser.parse_args()
+
+    failures = asyncio.run(check_plans(args.seed))
+    if failures:
+        print(f"Запросов с последовательным сканированием: {failures}")
+        sys.exit(1)
+    print("Последовательных сканирований не найдено")
+
+
+if __name__ == "__main__":
+    main()
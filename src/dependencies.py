@@ -1,19 +1,31 @@
 """Зависимости"""
 
+import logging
+import secrets
 from enum import Enum
 from typing import AsyncGenerator, Awaitable, Callable
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from authx import TokenPayload, RequestToken
 from authx.exceptions import MissingTokenError, JWTDecodeError
+from redis.exceptions import RedisError
 
 from src.db.models.student import Student
 from src.db.models.teacher import Teacher
 from src.db.db_manager import get_database_manager
 from src.auth.security import security
+from src.auth.identity import check_token_claims, get_user_identity
+from src.rate_limit import RateLimitRule, rate_limiter
+from src.integrations.redis import redis_service
+from src.settings import db_settings, export_settings, monitoring_settings
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+LAST_WRITE_PREFIX = "last_write"
 
 class UserRole(str, Enum):
     """Роль пользователя"""
@@ -28,6 +40,46 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def mark_user_write(user_id: int) -> None:
+    """Отметка о записи пользователя: его чтения временно идут в основную базу"""
+    try:
+        await redis_service.set(
+            f"{LAST_WRITE_PREFIX}:{user_id}", "1", ex=db_settings.DB_READ_YOUR_WRITES_TTL
+        )
+    except RedisError as e:
+        logger.warning("Не удалось сохранить отметку о записи: %s", e)
+
+
+async def has_recent_write(user_id: int) -> bool:
+    """Была ли у пользователя недавняя запись"""
+    try:
+        return await redis_service.get(f"{LAST_WRITE_PREFIX}:{user_id}") is not None
+    except RedisError:
+        return True  # без Redis читаем из основной базы
+
+
+async def get_read_session(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Получение сессии для чтения (реплика, если доступна).
+
+    Используется после require_role: пользователь, недавно изменявший данные,
+    читает из основной базы, чтобы увидеть свои изменения. Чтение из основной
+    базы идет через сессию запроса (get_session), а не через отдельную сессию.
+    """
+    manager = get_database_manager()
+    user_id = getattr(request.state, "user_id", None)
+    if not manager.replicas or (user_id is not None and await has_recent_write(user_id)):
+        yield session
+        return
+
+    # Соединение с основной базой, занятое проверкой прав, больше не нужно
+    await session.close()
+    async with manager.get_read_session_factory()() as read_session:
+        yield read_session
+
+
 @asynccontextmanager
 async def get_db_session():
     """Создаёт сессию вне FastAPI-зависимости."""
@@ -77,16 +129,32 @@ async def get_user_by_username(username: str, session: AsyncSession) -> Student
     )
 
 
-async def verify_token(request: Request, session: AsyncSession) -> Student | Teacher:
-    """Проверка токена"""
+async def verify_token(request: Request, session: AsyncSession) -> tuple[int, str]:
+    """Проверка токена
+
+    Returns:
+        ID и роль пользователя
+    """
     try:
         # Валидация токена
         token: RequestToken = await security.get_access_token_from_request(request)
         #token.csrf = request.headers.get("X-CSRF-TOKEN")
         token_payload: TokenPayload = security.verify_token(token, verify_csrf=False)
-        # Получение пользователя
         user_id = int(token_payload.sub)
-        return await get_user_by_id(user_id, session)
+
+        # Роль из токена, если версия профиля актуальна
+        role = await check_token_claims(user_id, token_payload.model_extra or {}, session)
+        if role is not None:
+            return user_id, role
+
+        # Получение роли пользователя (из кэша или БД)
+        identity = await get_user_identity(user_id, session)
+        if identity.is_deleted:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Пользователь удален"
+            )
+        return identity.id, identity.role
 
     except MissingTokenError as e:
         raise HTTPException(
@@ -100,8 +168,16 @@ async def verify_token(request: Request, session: AsyncSession) -> Student | Tea
         ) from e
 
 
-def require_role(required_role: UserRole) -> Callable[[Request, AsyncSession], Awaitable[int]]:
-    """Создает зависимость для проверки прав"""
+def require_role(
+    required_role: UserRole,
+    rate_limit: RateLimitRule | None = None
+) -> Callable[[Request, AsyncSession], Awaitable[int]]:
+    """Создает зависимость для проверки прав
+
+    Args:
+        required_role: Требуемая роль
+        rate_limit: Ограничение частоты запросов по ID пользователя
+    """
     async def dependency(
             request: Request,
             session: AsyncSession = Depends(get_session)
@@ -109,19 +185,46 @@ def require_role(required_role: UserRole) -> Callable[[Request, AsyncSession], A
         """Проверка прав пользователя"""
         # if required_role == UserRole.STUDENT:
         #     return 660828911
-        current_user = await verify_token(request, session)
-        if required_role == UserRole.STUDENT and not isinstance(current_user, Student):
+        user_id, role = await verify_token(request, session)
+        if required_role == UserRole.STUDENT and role != UserRole.STUDENT:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Требуется роль студента"
             )
-        if required_role == UserRole.TEACHER and not isinstance(current_user, Teacher):
+        if required_role == UserRole.TEACHER and role != UserRole.TEACHER:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Требуется роль репетитора"
             )
         if required_role == UserRole.AUTHORIZED:
             pass
-        return current_user.id
+        if rate_limit is not None:
+            await rate_limiter.hit(rate_limit, user_id)
+
+        request.state.user_id = user_id
+        if request.method not in SAFE_METHODS and get_database_manager().replicas:
+            await mark_user_write(user_id)
+        return user_id
 
     return dependency
+
+
+async def require_export_token(x_export_token: str | None = Header(None)) -> None:
+    """Проверка токена полной выгрузки данных"""
+    expected = export_settings.EXPORT_TOKEN
+    if not expected or x_export_token is None or not secrets.compare_digest(x_export_token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Неверный токен выгрузки"
+        )
+
+
+async def require_monitoring_token(x_monitoring_token: str | None = Header(None)) -> None:
+    """Проверка токена служебных эндпоинтов мониторинга"""
+    expected = monitoring_settings.MONITORING_TOKEN
+    token = x_monitoring_token
+    if not expected or token is None or not secrets.compare_digest(token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Неверный токен мониторинга"
+        )
@@ -0,0 +1,73 @@
+"""Роутер для выгрузки данных"""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dependencies import UserRole, get_read_session, require_export_token, require_role
+from src.exports.schemas import ExportFormat
+from src.exports.service import (
+    MEDIA_TYPES,
+    applications_dump_query,
+    matches_dump_query,
+    stream_export,
+    student_applications_query,
+    teacher_matches_query
+)
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+
+def export_response(
+    query: Select,
+    export_format: ExportFormat,
+    filename: str,
+    session: AsyncSession
+) -> StreamingResponse:
+    """Потоковый ответ с выгрузкой"""
+    return StreamingResponse(
+        stream_export(query, export_format, session),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
+
+
+@router.get("/applications/student", summary="Выгрузка своих заявок")
+async def export_student_applications(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    user_id: int = Depends(require_role(UserRole.STUDENT)),
+    session: AsyncSession = Depends(get_read_session)
+) -> StreamingResponse:
+    """Выгрузка всех своих заявок"""
+    return export_response(student_applications_query(user_id), export_format, "applications", session)
+
+
+@router.get("/matches/teacher", summary="Выгрузка истории откликов")
+async def export_teacher_matches(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    user_id: int = Depends(require_role(UserRole.TEACHER)),
+    session: AsyncSession = Depends(get_read_session)
+) -> StreamingResponse:
+    """Выгрузка всех своих откликов"""
+    return export_response(teacher_matches_query(user_id), export_format, "matches", session)
+
+
+@router.get("/applications", summary="Выгрузка всех заявок")
+async def export_applications(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    _token: None = Depends(require_export_token),
+    session: AsyncSession = Depends(get_read_session)
+) -> StreamingResponse:
+    """Выгрузка всех заявок (по токену выгрузки)"""
+    return export_response(applications_dump_query(), export_format, "applications", session)
+
+
+@router.get("/matches", summary="Выгрузка всех откликов")
+async def export_matches(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    _token: None = Depends(require_export_token),
+    session: AsyncSession = Depends(get_read_session)
+) -> StreamingResponse:
+    """Выгрузка всех откликов (по токену выгрузки)"""
+    return export_response(matches_dump_query(), export_format, "matches", session)
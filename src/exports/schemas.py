@@ -0,0 +1,10 @@
+"""Схемы для выгрузки данных"""
+
+from enum import Enum
+
+
+class ExportFormat(str, Enum):
+    """Формат выгрузки"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
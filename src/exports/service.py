@@ -0,0 +1,135 @@
+"""Сервисные функции для выгрузки данных
+
+Строки читаются курсором на стороне сервера (session.stream) пачками
+по EXPORT_CHUNK_SIZE и сразу отдаются клиенту, поэтому расход памяти
+не зависит от объема выгрузки.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.application import Application
+from src.db.models.matches import Match
+from src.db.models.student import Student
+from src.db.models.subject import Subject
+from src.exports.schemas import ExportFormat
+from src.settings import export_settings
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def student_applications_query(user_id: int) -> Select:
+    """Заявки ученика"""
+    return (
+        select(
+            Application.id,
+            Subject.name.label("subject_name"),
+            Application.price,
+            Application.lessons_count,
+            Application.description,
+            Application.status,
+            Application.created_at,
+        )
+        .join(Subject, Subject.id == Application.subject_id)
+        .where(Application.student_id == user_id)
+        .order_by(Application.created_at.desc())
+    )
+
+
+def teacher_matches_query(user_id: int) -> Select:
+    """История откликов репетитора"""
+    return (
+        select(
+            Match.id,
+            Match.application_id,
+            Subject.name.label("subject_name"),
+            Student.name.label("student_name"),
+            Student.surname.label("student_surname"),
+            Match.status,
+            Match.created_at,
+            Match.updated_at,
+        )
+        .join(Application, Application.id == Match.application_id)
+        .join(Subject, Subject.id == Application.subject_id)
+        .join(Student, Student.id == Match.student_id)
+        .where(Match.teacher_id == user_id)
+        .order_by(Match.updated_at.desc())
+    )
+
+
+def applications_dump_query() -> Select:
+    """Все заявки"""
+    return select(
+        Application.id,
+        Application.student_id,
+        Application.subject_id,
+        Application.price,
+        Application.lessons_count,
+        Application.status,
+        Application.created_at,
+    ).order_by(Application.id)
+
+
+def matches_dump_query() -> Select:
+    """Все отклики"""
+    return select(
+        Match.id,
+        Match.student_id,
+        Match.teacher_id,
+        Match.application_id,
+        Match.status,
+        Match.created_at,
+        Match.updated_at,
+    ).order_by(Match.id)
+
+
+def _serialize(value: Any) -> Any:
+    """Значение поля для выгрузки"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _format_ndjson(rows: Sequence[RowMapping]) -> str:
+    """Пачка строк в формате NDJSON"""
+    return "".join(
+        json.dumps({key: _serialize(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _format_csv(rows: Sequence[Sequence[Any]]) -> str:
+    """Пачка строк в формате CSV"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_serialize(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_export(
+    query: Select,
+    export_format: ExportFormat,
+    session: AsyncSession
+) -> AsyncIterator[str]:
+    """Потоковая выгрузка результата запроса"""
+    if export_format == ExportFormat.CSV:
+        yield _format_csv([[column.key for column in query.selected_columns]])
+
+    result = await session.stream(query.execution_options(yield_per=export_settings.EXPORT_CHUNK_SIZE))
+    async for rows in result.mappings().partitions():
+        if export_format == ExportFormat.CSV:
+            yield _format_csv([list(row.values()) for row in rows])
+        else:
+            yield _format_ndjson(rows)
@@ -3,13 +3,18 @@
 import asyncio
 from datetime import datetime
 import json
+import logging
+import time
 from typing import Sequence
 
+from redis.exceptions import RedisError
+
 from src.db.models.application import LessonsCount
-from src.db.models.teacher import Teacher
-from src.integrations.redis import redis_service
-from src.integrations.schemas import NotificationEvent, EventType, ReviewEvent
-from src.settings import redis_settings
+from src.integrations.redis import redis_service, stream_cursor_key, stream_id_ms
+from src.integrations.schemas import BroadcastEvent, NotificationEvent, EventType, ReviewEvent
+from src.settings import bot_settings, redis_settings
+
+logger = logging.getLogger(__name__)
 
 
 LESSONS_MAP = {
@@ -44,14 +49,56 @@ async def send_review_notification(user_id: int, message: str, review_id: int) -
     )
 
 
+async def get_bot_lag() -> float | None:
+    """Отставание бота от stream уведомлений (секунды; None - неизвестно)"""
+    stream = redis_settings.STREAM_FROM_BACKEND
+    async with redis_service.redis_client.pipeline(transaction=False) as pipe:
+        pipe.get(stream_cursor_key(stream))
+        pipe.xrevrange(stream, count=1)
+        processed_id, last = await pipe.execute()
+    if processed_id is None or not last:
+        return None
+    return max(stream_id_ms(last[0][0]) - stream_id_ms(processed_id), 0) / 1000
+
+
+async def wait_for_bot() -> None:
+    """Ожидание, пока отставание бота не станет допустимым (не дольше NEWSLETTER_MAX_WAIT)"""
+    deadline = time.monotonic() + bot_settings.NEWSLETTER_MAX_WAIT
+    while True:
+        lag = await get_bot_lag()
+        if lag is None or lag <= bot_settings.NEWSLETTER_MAX_LAG:
+            return
+        if time.monotonic() >= deadline:
+            logger.warning("Бот отстает от stream уведомлений на %s с, рассылка без ожидания", lag)
+            return
+        await asyncio.sleep(1)
+
+
 async def notify_teachers(ids: list[int], message: str) -> None:
-    """Отправка уведомления репетиторам"""
-    for i in ids:
-        await send_notification(i, message)
+    """Отправка уведомления репетиторам
+
+    Получатели делятся на пачки по NEWSLETTER_CHUNK_SIZE, каждая пачка - одно
+    событие рассылки с общим текстом. Если бот отстает от stream, следующая
+    пачка отправляется после того, как он догонит.
+    """
+    size = bot_settings.NEWSLETTER_CHUNK_SIZE
+    try:
+        for start in range(0, len(ids), size):
+            await wait_for_bot()
+            await redis_service.xadd(
+                redis_settings.STREAM_FROM_BACKEND,
+                fields={"payload": json.dumps(BroadcastEvent(
+                    event_type=EventType.BROADCAST,
+                    user_ids=ids[start:start + size],
+                    message=message
+                ).model_dump())}
+            )
+    except RedisError as e:
+        logger.error("Ошибка рассылки уведомлений: %s", e)
 
 
 def new_application_newsletter(
-    teachers: Sequence[Teacher],
+    telegram_ids: Sequence[int],
     subject_name: str,
     price: int,
     date: datetime,
@@ -68,6 +115,4 @@ def new_application_newsletter(
         f"<b>Количество уроков:</b> {lessons_str}\n"
         f"<b>Опубликована:</b> {dt_str}"
     )
-    asyncio.create_task(notify_teachers(
-        [t.telegram_id for t in teachers if t.telegram_id is not None], text
-    ))
+    asyncio.create_task(notify_teachers(list(telegram_ids), text))
@@ -21,11 +21,47 @@ class RedisService:
         """Добавление сообщения в stream"""
         await self.redis_client.xadd(stream, fields=fields, maxlen=500)
 
+    async def get(self, key: str) -> bytes | None:
+        """Получение значения по ключу"""
+        return await self.redis_client.get(key)
+
+    async def set(self, key: str, value: str | bytes, ex: int | None = None) -> None:
+        """Сохранение значения по ключу"""
+        await self.redis_client.set(key, value, ex=ex)
+
+    async def set_nx(self, key: str, value: str | bytes, ex: int) -> bool:
+        """Сохранение значения, только если ключа еще нет"""
+        return bool(await self.redis_client.set(key, value, ex=ex, nx=True))
+
+    async def getdel(self, key: str) -> bytes | None:
+        """Атомарное получение и удаление значения"""
+        return await self.redis_client.getdel(key)
+
+    async def incr(self, key: str) -> int:
+        """Атомарное увеличение счетчика"""
+        return await self.redis_client.incr(key)
+
+    async def delete(self, *keys: str) -> None:
+        """Удаление ключей"""
+        await self.redis_client.delete(*keys)
+
     async def xread(self, stream: str, last_id: str, count: int = 10, block: int = 5000):
         """Чтение сообщений из stream"""
         return await self.redis_client.xread({stream: last_id}, count=count, block=block)
 
 
+def stream_id_ms(message_id: bytes | str) -> int:
+    """Время добавления сообщения stream (мс) по его ID"""
+    if isinstance(message_id, bytes):
+        message_id = message_id.decode()
+    return int(message_id.split("-", 1)[0])
+
+
+def stream_cursor_key(stream: str) -> str:
+    """Ключ с ID последнего обработанного читателем сообщения stream"""
+    return f"{stream}:last_id"
+
+
 async def read_stream_messages(
     redis_s: RedisService,
     stream: str,
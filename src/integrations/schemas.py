@@ -10,6 +10,7 @@ class EventType(str, Enum):
     REGISTRATION_FINISH = "registration_finish"
     AUTH = "auth"
     NOTIFICATION = "notification"
+    BROADCAST = "broadcast"
     REVIEW = "review"
     REVIEW_RESPONSE = "review_response"
 
@@ -57,6 +58,12 @@ class NotificationEvent(BaseEvent):
     message: str = Field(..., description="Сообщение пользователю")
 
 
+class BroadcastEvent(BaseEvent):
+    """Одно сообщение нескольким пользователям (рассылка)"""
+    user_ids: list[int] = Field(..., description="ID пользователей в Telegram")
+    message: str = Field(..., description="Сообщение пользователям")
+
+
 class ReviewEvent(BaseEvent):
     """Сообщение пользователю о новом отзыве"""
     user_id: int = Field(..., description="ID пользователя в Telegram")
@@ -0,0 +1,76 @@
+"""Данные из БД в памяти процесса с версией в Redis
+
+Данные загружаются из БД целиком. После их изменения версия в Redis
+увеличивается; каждый воркер сверяет версию не чаще раза в check_interval
+секунд и при изменении перезагружает данные.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.integrations.redis import redis_service
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedCache(ABC):
+    """Базовый класс данных в памяти процесса с версией в Redis"""
+
+    def __init__(self, version_key: str, check_interval: float):
+        """Инициализация
+
+        Args:
+            version_key: Ключ версии в Redis
+            check_interval: Интервал проверки версии в Redis (секунды)
+        """
+        self.version_key = version_key
+        self.check_interval = check_interval
+        self._loaded = False
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    async def _get_version(self) -> int | None:
+        """Версия в Redis (None, если Redis недоступен)"""
+        try:
+            raw = await redis_service.get(self.version_key)
+        except RedisError as e:
+            logger.warning("Не удалось получить версию %s: %s", self.version_key, e)
+            return None
+        return int(raw) if raw is not None else 0
+
+    @abstractmethod
+    async def _fill(self, session: AsyncSession) -> None:
+        """Загрузка данных из БД (реализуется наследником)"""
+
+    async def load(self, session: AsyncSession) -> None:
+        """Загрузка данных из БД"""
+        version = await self._get_version()
+        await self._fill(session)
+        self._version = version
+        self._checked_at = time.monotonic()
+        self._loaded = True
+
+    async def ensure_fresh(self, session: AsyncSession) -> None:
+        """Загрузка данных, если они не загружены или изменилась версия"""
+        if not self._loaded:
+            await self.load(session)
+            return
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        self._checked_at = time.monotonic()
+        version = await self._get_version()
+        if version is not None and version != self._version:
+            await self.load(session)
+
+    async def bump_version(self) -> None:
+        """Увеличение версии (после изменения данных в БД)"""
+        self._loaded = False
+        try:
+            await redis_service.incr(self.version_key)
+        except RedisError as e:
+            logger.warning("Не удалось обновить версию %s: %s", self.version_key, e)
@@ -7,10 +7,21 @@ from contextlib import asynccontextmanager
 import stackprinter  # type: ignore
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from fastapi import FastAPI, APIRouter, Request, Response, status
+from fastapi import Depends, FastAPI, APIRouter, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.db.db_manager import get_database_manager
+from src.db.instrumentation import start_query_stats
+from src.dependencies import require_monitoring_token
+from src.settings import db_settings
 from src.integrations.service import listen_bot_events
+from src.auth.service import run_sessions_purge
+from src.applications.archiver import run_archiver
+from src.subjects.registry import subject_registry
+from src.teacher.audience import teacher_audience
 
 from src.auth.router import router as auth_router
 from src.teacher.router import router as teacher_router
@@ -19,6 +30,7 @@ from src.subjects.router import router as subjects_router
 from src.applications.router import router as applications_router
 from src.matches.router import router as matches_router
 from src.reviews.router import router as reviews_router
+from src.exports.router import router as exports_router
 
 # Логирование
 logging.basicConfig(level=logging.INFO)
@@ -54,6 +66,10 @@ tags_metadata = [
         "name": "Reviews",
         "description": "Эндпоинты для работы с отзывами",
     },
+    {
+        "name": "Exports",
+        "description": "Потоковая выгрузка заявок и откликов (NDJSON или CSV)",
+    },
     {
         "name": "Monitoring",
         "description": "Эндпоинты для проверки работоспособности приложения",
@@ -65,7 +81,25 @@ async def lifespan(_app: FastAPI):
     """Контекстный менеджер для управления жизненным циклом приложения."""
     logger.info("Запуск сервера...")
 
+    db_manager = get_database_manager()
+
+    # Справочник предметов и индекс рассылки (при ошибке будут загружены при первом обращении)
+    try:
+        async with db_manager.session_factory() as session:
+            await subject_registry.load(session)
+            await teacher_audience.load(session)
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning("Не удалось загрузить справочник предметов и индекс рассылки: %s", e)
+
     listen_bot = asyncio.create_task(listen_bot_events())
+    sessions_purge = asyncio.create_task(run_sessions_purge())
+    archiver = asyncio.create_task(run_archiver())
+
+    replicas_monitor = None
+    if db_manager.replicas:
+        replicas_monitor = asyncio.create_task(db_manager.monitor_replicas(
+            db_settings.DB_REPLICA_CHECK_INTERVAL, db_settings.DB_REPLICA_MAX_LAG
+        ))
 
     yield
 
@@ -75,6 +109,25 @@ async def lifespan(_app: FastAPI):
     except asyncio.CancelledError:
         logger.info("Остановка прослушивания событий от Telegram-бота...")
 
+    sessions_purge.cancel()
+    try:
+        await sessions_purge
+    except asyncio.CancelledError:
+        logger.info("Остановка очистки истекших сессий...")
+
+    archiver.cancel()
+    try:
+        await archiver
+    except asyncio.CancelledError:
+        logger.info("Остановка архивации заявок...")
+
+    if replicas_monitor is not None:
+        replicas_monitor.cancel()
+        try:
+            await replicas_monitor
+        except asyncio.CancelledError:
+            logger.info("Остановка проверки реплик...")
+
     logger.info("Остановка сервера...")
 
 
@@ -87,21 +140,67 @@ app = FastAPI(
 api_router = APIRouter(prefix="/api")
 
 
-@app.middleware("http")
-async def log_process_time(request: Request, call_next):
-    """Логирование времени обработки запроса."""
-    start_time = time.time()
+class RequestTimingMiddleware:
+    """Логирование времени обработки запроса и SQL-запросов
+
+    Итоги подводятся после отправки последней части тела ответа, поэтому
+    запросы, выполняемые при потоковой отдаче (StreamingResponse), тоже учитываются.
+    Заголовок Server-Timing уходит вместе с началом ответа: для потоковых
+    ответов в нем только запросы, выполненные до начала отдачи.
+    """
 
-    response: Response = await call_next(request)
+    def __init__(self, asgi_app: ASGIApp):
+        """Инициализация middleware"""
+        self.app = asgi_app
 
-    process_time = round(time.time() - start_time, 4)
-    method = request.method
-    path = request.url.path
-    code = response.status_code
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка запроса"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    logger.info("%s %s %s %ss", method, path, code, process_time)
+        start_time = time.time()
+        stats = start_query_stats(scope["path"])
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        streamed = False
 
-    return response
+        async def send_with_timing(message: Message) -> None:
+            """Добавление Server-Timing и учет потоковой отдачи"""
+            nonlocal status_code, streamed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", (
+                    f'db;dur={stats.duration_ms};desc="{stats.count} queries", '
+                    f"total;dur={round((time.time() - start_time) * 1000, 3)}"
+                ))
+            elif message["type"] == "http.response.body" and message.get("more_body"):
+                streamed = True
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+        process_time = round(time.time() - start_time, 4)
+        method = scope["method"]
+        path = scope["path"]
+        kind = " stream" if streamed else ""
+        logger.info(
+            "%s %s %s %ss db=%s/%sms%s",
+            method, path, status_code, process_time, stats.count, stats.duration_ms, kind
+        )
+
+        over_count = db_settings.DB_QUERY_BUDGET and stats.count > db_settings.DB_QUERY_BUDGET
+        over_time = (
+            db_settings.DB_QUERY_TIME_BUDGET
+            and stats.duration_ms > db_settings.DB_QUERY_TIME_BUDGET
+        )
+        if over_count or over_time:
+            logger.warning(
+                "Превышен бюджет SQL-запросов: %s %s%s - %s запросов, %sms",
+                method, path, kind, stats.count, stats.duration_ms
+            )
+
+
+app.add_middleware(RequestTimingMiddleware)
 
 
 @app.exception_handler(RequestValidationError)
@@ -120,6 +219,37 @@ def health():
     return {"status": "ok"}
 
 
+@api_router.get(
+    "/health/db",
+    tags=["Monitoring"],
+    dependencies=[Depends(require_monitoring_token)]
+)
+def health_db():
+    """Состояние пула соединений с базой данных
+
+    Доступен только с заголовком X-Monitoring-Token.
+    """
+    db_manager = get_database_manager()
+    return {"pool": db_manager.get_pool_stats(), "replicas": db_manager.get_replica_stats()}
+
+
+@api_router.get(
+    "/health/slow-queries",
+    tags=["Monitoring"],
+    dependencies=[Depends(require_monitoring_token)]
+)
+def health_slow_queries():
+    """Журнал медленных запросов (включается настройкой DB_SLOW_QUERY_LOG)
+
+    Доступен только с заголовком X-Monitoring-Token.
+    """
+    db_manager = get_database_manager()
+    return {
+        "enabled": db_manager.slow_query_log is not None,
+        "queries": db_manager.get_slow_queries(),
+    }
+
+
 api_router.include_router(auth_router)
 api_router.include_router(teacher_router)
 api_router.include_router(student_router)
@@ -127,6 +257,7 @@ api_router.include_router(subjects_router)
 api_router.include_router(applications_router)
 api_router.include_router(matches_router)
 api_router.include_router(reviews_router)
+api_router.include_router(exports_router)
 
 app.include_router(api_router)
 
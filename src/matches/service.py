@@ -7,7 +7,7 @@ from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models.application import Application
-from src.db.models.matches import Match, MatchStatus
+from src.db.models.matches import OPEN_MATCH_STATUSES, Match, MatchStatus
 from src.db.models.review import Review
 from src.db.models.student import Student
 from src.db.models.teacher import Teacher
@@ -102,7 +102,9 @@ async def complete_user_match(
     session: AsyncSession
 ) -> None:
     """Завершение отклика"""
-    match = await session.get(Match, match_id)
+    match = (await session.execute(
+        select(Match).where(Match.id == match_id, Match.status.in_(OPEN_MATCH_STATUSES))
+    )).scalar_one_or_none()
     if not match:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Отклик не найден")
 
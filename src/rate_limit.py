@@ -0,0 +1,169 @@
+"""Ограничение частоты запросов
+
+Скользящее окно на отсортированных множествах Redis (общее для всех воркеров).
+При недоступности Redis используется окно в памяти процесса.
+
+В окно попадают только пропущенные запросы: отклоненные с 429 лимит не продлевают,
+и после Retry-After запрос гарантированно проходит.
+"""
+
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Callable, Awaitable
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, Field
+from redis.exceptions import RedisError
+
+from src.integrations.redis import redis_service
+from src.settings import rate_limit_settings
+
+logger = logging.getLogger(__name__)
+
+# Проверка и учет запроса одной командой: запрос добавляется в окно,
+# только если лимит не превышен. Возвращает {пропущен (0/1), время самого старого запроса}
+HIT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+local allowed = 0
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    allowed = 1
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {allowed, oldest[2] or ARGV[1]}
+"""
+
+
+class RateLimitRule(BaseModel):
+    """Правило ограничения: не более limit запросов за window секунд"""
+    name: str = Field(..., description="Название правила (часть ключа)")
+    limit: int = Field(..., gt=0, description="Максимум запросов в окне")
+    window: int = Field(..., gt=0, description="Размер окна в секундах")
+
+    @classmethod
+    def parse(cls, name: str, value: str) -> "RateLimitRule":
+        """Создание правила из строки вида '10/60'"""
+        limit, window = value.split("/")
+        return cls(name=name, limit=int(limit), window=int(window))
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов"""
+
+    def __init__(self, prefix: str = "rate_limit", max_local_keys: int = 10000):
+        """Инициализация ограничителя
+
+        Args:
+            prefix: Префикс ключей в Redis
+            max_local_keys: Максимальное количество ключей в памяти процесса
+        """
+        self.prefix = prefix
+        self.max_local_keys = max_local_keys
+        # Ключ -> (размер окна правила, время запросов в окне)
+        self._local: dict[str, tuple[int, deque[float]]] = {}
+
+    async def _hit_redis(self, key: str, rule: RateLimitRule, now: float) -> tuple[bool, float]:
+        """Проверка лимита и учет запроса в Redis
+
+        Returns:
+            Пропущен ли запрос и время самого старого запроса в окне
+        """
+        allowed, oldest = await redis_service.redis_client.eval(
+            HIT_SCRIPT, 1, key, repr(now), rule.window, rule.limit, f"{now}:{secrets.token_hex(4)}"
+        )
+        return bool(allowed), float(oldest)
+
+    def _hit_local(self, key: str, rule: RateLimitRule, now: float) -> tuple[bool, float]:
+        """Проверка лимита и учет запроса в памяти процесса
+
+        Returns:
+            Пропущен ли запрос и время самого старого запроса в окне
+        """
+        if len(self._local) > self.max_local_keys:
+            # У каждого ключа свое окно: ключи длинных правил не удаляются по окну короткого
+            self._local = {
+                k: (window, hits) for k, (window, hits) in self._local.items()
+                if hits and hits[-1] > now - window
+            }
+
+        _, hits = self._local.setdefault(key, (rule.window, deque()))
+        while hits and hits[0] <= now - rule.window:
+            hits.popleft()
+        if len(hits) >= rule.limit:
+            return False, hits[0]
+        hits.append(now)
+        return True, hits[0]
+
+    async def hit(self, rule: RateLimitRule, identifier: str | int) -> None:
+        """Учет запроса и проверка лимита
+
+        Raises:
+            HTTPException: 429, если лимит превышен
+        """
+        if not rate_limit_settings.RATE_LIMIT_ENABLED:
+            return
+
+        key = f"{self.prefix}:{rule.name}:{identifier}"
+        now = time.time()
+        try:
+            allowed, oldest = await self._hit_redis(key, rule, now)
+        except RedisError as e:
+            logger.warning("Redis недоступен, лимит считается локально: %s", e)
+            allowed, oldest = self._hit_local(key, rule, now)
+
+        if not allowed:
+            retry_after = max(1, int(oldest + rule.window - now))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Слишком много запросов, попробуйте позже",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+rate_limiter = RateLimiter()
+
+# Правила
+LOGIN_IP_RULE = RateLimitRule.parse("login:ip", rate_limit_settings.LOGIN_IP_RATE_LIMIT)
+LOGIN_USERNAME_RULE = RateLimitRule.parse(
+    "login:username", rate_limit_settings.LOGIN_USERNAME_RATE_LIMIT
+)
+LOGIN_VERIFY_IP_RULE = RateLimitRule.parse(
+    "login_verify:ip", rate_limit_settings.LOGIN_VERIFY_IP_RATE_LIMIT
+)
+LOGIN_VERIFY_USERNAME_RULE = RateLimitRule.parse(
+    "login_verify:username", rate_limit_settings.LOGIN_VERIFY_USERNAME_RATE_LIMIT
+)
+REGISTER_IP_RULE = RateLimitRule.parse("register:ip", rate_limit_settings.REGISTER_IP_RATE_LIMIT)
+WRITE_USER_RULE = RateLimitRule.parse("write:user", rate_limit_settings.WRITE_USER_RATE_LIMIT)
+
+
+TRUSTED_PROXIES = rate_limit_settings.get_trusted_proxies()
+
+
+def client_ip(request: Request) -> str:
+    """IP клиента
+
+    За доверенным прокси (RATE_LIMIT_TRUSTED_PROXIES) - последний адрес
+    X-Forwarded-For, не принадлежащий доверенным прокси. Адреса левее
+    подставляет сам клиент, поэтому им не доверяем.
+    """
+    host = request.client.host if request.client else "unknown"
+    if host not in TRUSTED_PROXIES:
+        return host
+    forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",")]
+    for address in reversed(forwarded):
+        if address and address not in TRUSTED_PROXIES:
+            return address
+    return host
+
+
+def rate_limit_ip(rule: RateLimitRule) -> Callable[[Request], Awaitable[None]]:
+    """Создает зависимость для ограничения запросов по IP клиента (см. client_ip)"""
+    async def dependency(request: Request) -> None:
+        """Проверка лимита по IP"""
+        await rate_limiter.hit(rule, client_ip(request))
+
+    return dependency
@@ -2,6 +2,8 @@
 
 from datetime import timedelta
 from functools import lru_cache
+from typing import Any, Literal
+from uuid import uuid4
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,6 +16,35 @@ class DatabaseSettings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
 
+    # Пул соединений (на один воркер)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+
+    # Кэш подготовленных запросов asyncpg и таймаут запросов на сервере (мс, 0 - без таймаута)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT: int = 0
+
+    # Режим совместимости с PgBouncer (transaction pooling)
+    DB_PGBOUNCER: bool = False
+
+    # Реплики для чтения: host:port через запятую
+    DB_REPLICA_HOSTS: str = ""
+    DB_REPLICA_MAX_LAG: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL: int = 5
+    DB_READ_YOUR_WRITES_TTL: int = 10
+
+    # Бюджет SQL-запросов на один HTTP-запрос (0 - без проверки)
+    DB_QUERY_BUDGET: int = 20
+    DB_QUERY_TIME_BUDGET: int = 200  # мс
+
+    # Журнал медленных запросов
+    DB_SLOW_QUERY_LOG: bool = False
+    DB_SLOW_QUERY_THRESHOLD: int = 100  # мс
+    DB_SLOW_QUERY_EXPLAIN_EVERY: int = 10  # план для каждого N-го запроса, 0 - без планов
+    DB_SLOW_QUERY_LOG_SIZE: int = 200
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     def get_db_url(self) -> str:
@@ -21,6 +52,38 @@ class DatabaseSettings(BaseSettings):
         return (f"postgresql+asyncpg://{self.DB_USER}:"
                 f"{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}")
 
+    def get_replica_urls(self) -> list[str]:
+        """Возвращает URL для подключения к репликам"""
+        return [
+            (f"postgresql+asyncpg://{self.DB_USER}:"
+             f"{self.DB_PASSWORD}@{host.strip()}/{self.DB_NAME}")
+            for host in self.DB_REPLICA_HOSTS.split(",") if host.strip()
+        ]
+
+    def get_engine_options(self) -> dict[str, Any]:
+        """Возвращает параметры пула и драйвера для create_async_engine"""
+        connect_args: dict[str, Any] = {}
+        if self.DB_PGBOUNCER:
+            # PgBouncer не сохраняет подготовленные запросы и параметры сессии между транзакциями
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        else:
+            connect_args["prepared_statement_cache_size"] = self.DB_STATEMENT_CACHE_SIZE
+            if self.DB_STATEMENT_TIMEOUT:
+                connect_args["server_settings"] = {
+                    "statement_timeout": str(self.DB_STATEMENT_TIMEOUT)
+                }
+
+        return {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+            "connect_args": connect_args,
+        }
+
 
 class AuthSettings(BaseSettings):
     """Класс настроек аутентификации"""
@@ -30,6 +93,9 @@ class AuthSettings(BaseSettings):
     JWT_COOKIE_REFRESH_NAME: str
     JWT_ACCESS_TOKEN_EXPIRES: timedelta
     JWT_REFRESH_TOKEN_EXPIRES: timedelta
+    TOKEN_STORE: Literal["redis", "sql"] = "redis"
+    SESSION_PURGE_INTERVAL: int = 3600
+    SESSION_PURGE_BATCH_SIZE: int = 1000
 
     @property
     def JWT_COOKIE_MAX_AGE(self) -> float:  # pylint: disable=invalid-name
@@ -44,6 +110,16 @@ class BotSettings(BaseSettings):
 
     BOT_TOKEN: str
 
+    # Рассылка о новых заявках: получателей в одном событии, допустимое
+    # отставание бота (секунды) и максимальное ожидание при отставании (секунды)
+    NEWSLETTER_CHUNK_SIZE: int = 200
+    NEWSLETTER_MAX_LAG: float = 30.0
+    NEWSLETTER_MAX_WAIT: float = 60.0
+    # Рассылка из бота: сообщений в секунду (лимит Telegram - около 30)
+    # и количество повторов при ограничении частоты (429 Too Many Requests)
+    BOT_SEND_RATE: float = 25.0
+    BOT_SEND_RETRIES: int = 3
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -83,6 +159,96 @@ class MinioSettings(BaseSettings):
         return f"{self.MINIO_PUBLIC_HOST}:{self.MINIO_PORT}"
 
 
+class CacheSettings(BaseSettings):
+    """Класс настроек кэширования"""
+
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_LOCAL_TTL: int = 5
+    USER_CACHE_MAX_SIZE: int = 10000
+    SUBJECTS_VERSION_CHECK_INTERVAL: int = 30
+    TEACHER_AUDIENCE_CHECK_INTERVAL: int = 10
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+class RateLimitSettings(BaseSettings):
+    """Класс настроек ограничения частоты запросов (формат: запросов/секунд)"""
+
+    RATE_LIMIT_ENABLED: bool = True
+    LOGIN_IP_RATE_LIMIT: str = "20/60"
+    LOGIN_USERNAME_RATE_LIMIT: str = "5/300"
+    LOGIN_VERIFY_IP_RATE_LIMIT: str = "10/60"
+    LOGIN_VERIFY_USERNAME_RATE_LIMIT: str = "5/300"
+    REGISTER_IP_RATE_LIMIT: str = "10/3600"
+    WRITE_USER_RATE_LIMIT: str = "60/60"
+
+    # Адреса обратных прокси через запятую: для запросов от них IP клиента
+    # берется из X-Forwarded-For (иначе все клиенты за прокси делят один лимит)
+    RATE_LIMIT_TRUSTED_PROXIES: str = ""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    def get_trusted_proxies(self) -> set[str]:
+        """Возвращает адреса доверенных прокси"""
+        return {host.strip() for host in self.RATE_LIMIT_TRUSTED_PROXIES.split(",") if host.strip()}
+
+
+class FeedSettings(BaseSettings):
+    """Класс настроек ленты заявок"""
+
+    FEED_PAGE_SIZE: int = 20
+    FEED_MAX_PAGE_SIZE: int = 100
+
+    # Кэш ленты; окно - запас заявок сверх страницы на случай скрытых репетитором
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_TTL: int = 60
+    FEED_CACHE_OVERFETCH: int = 50
+    FEED_CACHE_LOCK_TIMEOUT: float = 3.0
+
+    # Время жизни множества исключений репетитора без обращений (секунды)
+    FEED_EXCLUSIONS_TTL: int = 86400
+
+    # Сортировка по релевантности: веса слагаемых оценки заявки
+    # (совпадение предмета, близость цены к ставке, новизна, количество уроков, поиск)
+    FEED_RANK_SUBJECT_WEIGHT: float = 4.0
+    FEED_RANK_PRICE_WEIGHT: float = 2.0
+    FEED_RANK_RECENCY_WEIGHT: float = 1.0
+    FEED_RANK_RECENCY_DAYS: float = 7.0
+    FEED_RANK_LESSONS_WEIGHT: float = 1.0
+    FEED_RANK_SEARCH_WEIGHT: float = 10.0
+
+    # Счетчики по фильтрам: время жизни в кэше и ширина столбца гистограммы цен
+    FEED_FACETS_TTL: int = 30
+    FEED_FACETS_PRICE_STEP: int = 500
+
+    # Архивация устаревших заявок и откликов
+    APPLICATION_MAX_AGE_DAYS: int = 30
+    MATCH_REQUEST_MAX_AGE_DAYS: int = 14
+    ARCHIVE_INTERVAL: int = 3600
+    ARCHIVE_BATCH_SIZE: int = 500
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+class ExportSettings(BaseSettings):
+    """Класс настроек выгрузки данных"""
+
+    # Токен для полной выгрузки (заголовок X-Export-Token); не задан - выгрузка отключена
+    EXPORT_TOKEN: str | None = None
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+class MonitoringSettings(BaseSettings):
+    """Класс настроек мониторинга"""
+
+    # Токен служебных эндпоинтов (заголовок X-Monitoring-Token); не задан - эндпоинты отключены
+    MONITORING_TOKEN: str | None = None
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
 @lru_cache
 def get_db_settings() -> DatabaseSettings:
     """Возвращает настройки базы данных с ленивой инициализацией"""
@@ -108,9 +274,39 @@ def get_minio_settings() -> MinioSettings:
     """Возвращает настройки MinIO с ленивой инициализацией"""
     return MinioSettings()
 
+@lru_cache
+def get_cache_settings() -> CacheSettings:
+    """Возвращает настройки кэширования с ленивой инициализацией"""
+    return CacheSettings()
+
+@lru_cache
+def get_rate_limit_settings() -> RateLimitSettings:
+    """Возвращает настройки ограничения частоты запросов с ленивой инициализацией"""
+    return RateLimitSettings()
+
+@lru_cache
+def get_feed_settings() -> FeedSettings:
+    """Возвращает настройки ленты заявок с ленивой инициализацией"""
+    return FeedSettings()
+
+@lru_cache
+def get_export_settings() -> ExportSettings:
+    """Возвращает настройки выгрузки данных с ленивой инициализацией"""
+    return ExportSettings()
+
+@lru_cache
+def get_monitoring_settings() -> MonitoringSettings:
+    """Возвращает настройки мониторинга с ленивой инициализацией"""
+    return MonitoringSettings()
+
 
 db_settings = get_db_settings()
 auth_settings = get_auth_settings()
 bot_settings = get_bot_settings()
 redis_settings = get_redis_settings()
 minio_settings = get_minio_settings()
+cache_settings = get_cache_settings()
+rate_limit_settings = get_rate_limit_settings()
+feed_settings = get_feed_settings()
+export_settings = get_export_settings()
+monitoring_settings = get_monitoring_settings()
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.matches.schemas import MatchResponse
 from src.schemas import UpdateActiveRequest
-from src.dependencies import require_role, UserRole, get_session
+from src.dependencies import require_role, UserRole, get_read_session, get_session
 from src.student.service import (
     delete_profile,
     get_profile_by_id,
@@ -28,7 +28,7 @@ router = APIRouter(prefix="/students", tags=["Students"])
 @router.get("/profile", summary="Получение профиля студента")
 async def get_student_profile(
     user_id: int = Depends(require_role(UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> StudentProfile:
     """
     Получение профиля студента с основной информацией
@@ -41,7 +41,7 @@ async def get_matches_student(
     archived: bool = Query(False, description="Завершенные"),
     rejected: bool = Query(False, description="Отклоненные"),
     user_id: int = Depends(require_role(UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> list[MatchResponse]:
     """Получение списка откликов на заявки"""
     return await get_student_matches(user_id, session, archived, rejected)
@@ -51,7 +51,7 @@ async def get_matches_student(
 async def get_student_by_id(
     student_id: int,
     user_id: int = Depends(require_role(UserRole.TEACHER)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> StudentProfileById:
     """
     Получение профиля студента от лица репетитора
@@ -4,11 +4,15 @@ from fastapi import HTTPException, status
 from sqlalchemy import delete, exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.applications.feed import update_feed_student_age
+from src.applications.feed_cache import feed_cache
+from src.auth.identity import bump_profile_version, user_identity_cache
+from src.auth.service import revoke_user_sessions
+from src.auth.token_store import token_store
 from src.db.models.association_tables import hidden_teachers
 from src.db.models.review import Review
 from src.db.models.student import Student
 from src.db.models.matches import Match, MatchStatus
-from src.db.models.token import Token
 
 from src.matches.schemas import MatchResponse
 from src.matches.service import get_user_matches
@@ -128,9 +132,12 @@ async def update_profile(user_id: int, profile: UpdateStudentRequest, session: A
         student.patronymic = profile.patronymic
     if profile.age is not None:
         student.age = profile.age
+        await update_feed_student_age(user_id, profile.age, session)
     if profile.bio is not None:
         student.bio = profile.bio
     await session.commit()
+    if profile.age is not None:
+        await feed_cache.bump_version()
 
 
 async def update_active_profile(user_id: int, data: UpdateActiveRequest, session: AsyncSession) -> None:
@@ -144,6 +151,7 @@ async def update_active_profile(user_id: int, data: UpdateActiveRequest, session
         )
     student.active = data.active
     await session.commit()
+    await user_identity_cache.invalidate(user_id)
 
 
 async def update_notification(
@@ -187,11 +195,12 @@ async def delete_profile(user_id: int, session: AsyncSession) -> None:
     await session.execute(
         delete(hidden_teachers).where(hidden_teachers.c.student_id == user_id)
     )
-    await session.execute(
-        delete(Token).where(Token.user_id == user_id)
-    )
+    await token_store.delete_user_tokens(user_id, session)
+    await revoke_user_sessions(user_id, session)
+    await bump_profile_version(Student, user_id, session)
     await session.execute(
         update(Match).where(Match.student_id == user_id).values(status=MatchStatus.ARCHIVED)
     )
 
     await session.commit()
+    await user_identity_cache.invalidate(user_id)
@@ -0,0 +1,84 @@
+"""Справочник предметов в памяти процесса
+
+Предметы практически не меняются, поэтому загружаются один раз при запуске
+и используются для поиска ID по названию без обращения к БД.
+
+После изменения таблицы subjects нужно увеличить версию справочника:
+    python -m src.subjects.registry
+Воркеры сверяют версию в Redis не чаще раза в SUBJECTS_VERSION_CHECK_INTERVAL
+секунд и при изменении перезагружают справочник.
+"""
+
+import asyncio
+import hashlib
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.subject import Subject
+from src.integrations.versioned_cache import VersionedCache
+from src.settings import cache_settings
+from src.subjects.schemas import SubjectSchema
+
+logger = logging.getLogger(__name__)
+
+SUBJECTS_VERSION_KEY = "subjects:version"
+
+
+class SubjectRegistry(VersionedCache):
+    """Справочник предметов: название <-> ID"""
+
+    def __init__(self, check_interval: float):
+        """Инициализация справочника
+
+        Args:
+            check_interval: Интервал проверки версии в Redis (секунды)
+        """
+        super().__init__(SUBJECTS_VERSION_KEY, check_interval)
+        self.etag = ""
+        self._by_name: dict[str, int] = {}
+        self._by_id: dict[int, str] = {}
+
+    async def _fill(self, session: AsyncSession) -> None:
+        """Загрузка справочника из БД"""
+        rows = (await session.execute(select(Subject.id, Subject.name).order_by(Subject.id))).all()
+
+        self._by_name = {name: subject_id for subject_id, name in rows}
+        self._by_id = {row.id: row.name for row in rows}
+        digest = hashlib.sha256("\n".join(name for _, name in rows).encode()).hexdigest()
+        self.etag = f'"{digest[:32]}"'
+        logger.info("Справочник предметов загружен: %s предметов", len(rows))
+
+    async def get_id(self, name: str, session: AsyncSession) -> int | None:
+        """ID предмета по названию"""
+        await self.ensure_fresh(session)
+        return self._by_name.get(name)
+
+    async def get_name(self, subject_id: int, session: AsyncSession) -> str | None:
+        """Название предмета по ID"""
+        await self.ensure_fresh(session)
+        return self._by_id.get(subject_id)
+
+    async def get_ids(self, names: list[str], session: AsyncSession) -> list[int]:
+        """ID существующих предметов из списка названий"""
+        await self.ensure_fresh(session)
+        return [self._by_name[name] for name in dict.fromkeys(names) if name in self._by_name]
+
+    async def get_all(self, session: AsyncSession) -> list[SubjectSchema]:
+        """Список всех предметов"""
+        await self.ensure_fresh(session)
+        return [SubjectSchema(name=name) for name in self._by_name]
+
+
+subject_registry = SubjectRegistry(check_interval=cache_settings.SUBJECTS_VERSION_CHECK_INTERVAL)
+
+
+async def bump_subjects_version() -> None:
+    """Увеличение версии справочника (после изменения таблицы subjects)"""
+    await subject_registry.bump_version()
+
+
+if __name__ == "__main__":
+    asyncio.run(bump_subjects_version())
+    print("Версия справочника предметов увеличена")
@@ -1,21 +1,32 @@
 """Роутер дял взаимодействия с предметами"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.dependencies import UserRole, get_session, require_role
+from src.subjects.registry import subject_registry
 from src.subjects.schemas import SubjectSchema
 from src.subjects.service import get_subjects
 
 router = APIRouter(prefix="/subjects", tags=["Subjects"])
 
 
-@router.get("/", summary="Получение списка предметов")
+@router.get("/", summary="Получение списка предметов", response_model=list[SubjectSchema])
 async def get_all_subjects(
+    request: Request,
+    response: Response,
     _user_id: int = Depends(require_role(UserRole.AUTHORIZED)),
     session: AsyncSession = Depends(get_session),
-) -> list[SubjectSchema]:
+) -> list[SubjectSchema] | Response:
     """
     Получение списка доступных предметов
+
+    Поддерживает условный запрос: при совпадении If-None-Match возвращается 304
     """
-    return await get_subjects(session)
+    subjects = await get_subjects(session)
+    headers = {"ETag": subject_registry.etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == subject_registry.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return subjects
@@ -1,16 +1,13 @@
 """Сервисные функции для работы с предметами"""
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from src.db.models.subject import Subject
+from src.subjects.registry import subject_registry
 from src.subjects.schemas import SubjectSchema
 
 
 async def get_subjects(session: AsyncSession) -> list[SubjectSchema]:
     """
-    Получение списка предметов
+    Получение списка предметов (из справочника в памяти)
     """
-    result = await session.execute(select(Subject))
-    subjects = result.scalars().all()
-    return [SubjectSchema(name=subject.name) for subject in subjects]
+    return await subject_registry.get_all(session)
@@ -0,0 +1,83 @@
+"""Индекс получателей рассылки о новых заявках
+
+Для каждого предмета в памяти процесса хранится список (ставка, Telegram ID)
+репетиторов, которые получают уведомления о заявках, отсортированный по ставке.
+Подбор получателей для заявки - два двоичных поиска по диапазону ставок.
+
+В индекс попадают активные неудаленные репетиторы с указанными ставкой и
+Telegram ID и включенными уведомлениями о заявках. После изменения этих данных
+нужно вызвать bump_audience_version(): воркеры сверяют версию в Redis не чаще
+раза в TEACHER_AUDIENCE_CHECK_INTERVAL секунд и при изменении перезагружают индекс.
+"""
+
+import bisect
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.association_tables import teacher_subjects
+from src.db.models.teacher import Teacher
+from src.integrations.versioned_cache import VersionedCache
+from src.settings import cache_settings
+
+logger = logging.getLogger(__name__)
+
+AUDIENCE_VERSION_KEY = "teacher_audience:version"
+
+# Допустимое отклонение ставки репетитора от цены заявки
+RATE_TOLERANCE = 0.1
+
+
+class TeacherAudienceIndex(VersionedCache):
+    """Индекс репетиторов по предмету и ставке"""
+
+    def __init__(self, check_interval: float):
+        """Инициализация индекса
+
+        Args:
+            check_interval: Интервал проверки версии в Redis (секунды)
+        """
+        super().__init__(AUDIENCE_VERSION_KEY, check_interval)
+        # ID предмета -> (ставки по возрастанию, Telegram ID в том же порядке)
+        self._by_subject: dict[int, tuple[list[int], list[int]]] = {}
+
+    async def _fill(self, session: AsyncSession) -> None:
+        """Загрузка индекса из БД"""
+        rows = (await session.execute(
+            select(teacher_subjects.c.subject_id, Teacher.rate, Teacher.telegram_id)
+            .join(Teacher, Teacher.id == teacher_subjects.c.teacher_id)
+            .where(
+                Teacher.application_notification.is_(True),
+                Teacher.active.is_(True),
+                Teacher.is_deleted.is_(False),
+                Teacher.rate.is_not(None),
+                Teacher.telegram_id.is_not(None)
+            )
+            .order_by(teacher_subjects.c.subject_id, Teacher.rate)
+        )).all()
+
+        by_subject: dict[int, tuple[list[int], list[int]]] = {}
+        for subject_id, rate, telegram_id in rows:
+            rates, telegram_ids = by_subject.setdefault(subject_id, ([], []))
+            rates.append(rate)
+            telegram_ids.append(telegram_id)
+
+        self._by_subject = by_subject
+        logger.info("Индекс рассылки загружен: %s записей", len(rows))
+
+    async def find(self, subject_id: int, price: int, session: AsyncSession) -> list[int]:
+        """Telegram ID репетиторов предмета со ставкой в пределах 10% от цены"""
+        await self.ensure_fresh(session)
+        rates, telegram_ids = self._by_subject.get(subject_id, ([], []))
+        start = bisect.bisect_left(rates, price * (1 - RATE_TOLERANCE))
+        end = bisect.bisect_right(rates, price * (1 + RATE_TOLERANCE))
+        return telegram_ids[start:end]
+
+
+teacher_audience = TeacherAudienceIndex(check_interval=cache_settings.TEACHER_AUDIENCE_CHECK_INTERVAL)
+
+
+async def bump_audience_version() -> None:
+    """Увеличение версии индекса (после изменения данных репетитора)"""
+    await teacher_audience.bump_version()
@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, File, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.dependencies import require_role, UserRole, get_session
+from src.dependencies import require_role, UserRole, get_read_session, get_session
 from src.matches.schemas import MatchResponse
 from src.schemas import UpdateActiveRequest
 from src.teacher.schemas import (
@@ -34,7 +34,7 @@ router = APIRouter(prefix="/teachers", tags=["Teachers"])
 @router.get("")
 async def get_teachers(
     _user_id: int = Depends(require_role(UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> list[TeacherInfo]:
     """Полученеи списка преподавателей"""
     return await get_all_teachers(session)
@@ -43,7 +43,7 @@ async def get_teachers(
 @router.get("/profile", summary="Получение профиля репетитора")
 async def get_teacher_profile(
     user_id: int = Depends(require_role(UserRole.TEACHER)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> TeacherProfile:
     """
     Получение профиля репетитора:
@@ -60,7 +60,7 @@ async def get_matches(
     archived: bool = Query(False, description="Завершенные"),
     rejected: bool = Query(False, description="Отклоненные"),
     user_id: int = Depends(require_role(UserRole.TEACHER)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> list[MatchResponse]:
     """Получение списка откликов на заявки"""
     return await get_teacher_matches(user_id, session, archived, rejected)
@@ -160,7 +160,7 @@ async def delete_teacher_profile(
 async def get_teacher_by_id(
     teacher_id: int,
     _user_id: int = Depends(require_role(UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ) -> TeacherByIdProfile:
     """Получение профиля репетитора от лица ученика"""
     return await get_profile_by_id(teacher_id, session)
@@ -5,16 +5,20 @@ from sqlalchemy import delete, insert, join, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models.matches import Match, MatchStatus
-from src.db.models.token import Token
 from src.db.models.review import Review
 from src.db.models.teacher import Teacher
 from src.db.models.subject import Subject
+from src.auth.identity import bump_profile_version, user_identity_cache
+from src.auth.service import revoke_user_sessions
+from src.auth.token_store import token_store
 from src.db.models.association_tables import hidden_applications, hidden_teachers, teacher_subjects
 
 from src.integrations.minio import delete_file, get_presigned_url, upload_file
 from src.matches.schemas import MatchResponse
 from src.matches.service import get_user_matches
 from src.schemas import UpdateActiveRequest, ReviewSchema
+from src.subjects.registry import subject_registry
+from src.teacher.audience import bump_audience_version
 from src.teacher.schemas import (
     TeacherByIdProfile,
     TeacherInfo,
@@ -232,6 +236,8 @@ async def update_profile(user_id: int, profile: UpdateTeacherRequest, session: A
     if profile.rate is not None:
         teacher.rate = profile.rate
     await session.commit()
+    if profile.rate is not None:
+        await bump_audience_version()
 
 
 async def update_active_profile(user_id: int, data: UpdateActiveRequest, session: AsyncSession) -> None:
@@ -245,6 +251,8 @@ async def update_active_profile(user_id: int, data: UpdateActiveRequest, session
         )
     teacher.active = data.active
     await session.commit()
+    await user_identity_cache.invalidate(user_id)
+    await bump_audience_version()
 
 
 async def update_subjects(user_id: int, data: UpdateSubjectsRequest, session: AsyncSession) -> None:
@@ -257,22 +265,21 @@ async def update_subjects(user_id: int, data: UpdateSubjectsRequest, session: As
     # Если список пуст
     if not data.subjects:
         await session.commit()
+        await bump_audience_version()
         return
 
     # Ищем предметы
-    result = await session.execute(
-        select(Subject.id, Subject.name).where(Subject.name.in_(data.subjects))
-    )
-    found_subjects = result.all()
+    subject_ids = await subject_registry.get_ids(data.subjects, session)
 
     # Добавляем новые связи при наличии предметов
-    if found_subjects:
+    if subject_ids:
         await session.execute(
             insert(teacher_subjects),
-            [{"teacher_id": user_id, "subject_id": sid} for sid, _ in found_subjects],
+            [{"teacher_id": user_id, "subject_id": sid} for sid in subject_ids],
         )
 
     await session.commit()
+    await bump_audience_version()
 
 
 async def update_notification(
@@ -297,6 +304,8 @@ async def update_notification(
     if data.archive_lessons_notification is not None:
         teacher.archive_lessons_notification = data.archive_lessons_notification
     await session.commit()
+    if data.application_notification is not None:
+        await bump_audience_version()
 
 
 async def delete_profile(user_id: int, session: AsyncSession) -> None:
@@ -327,11 +336,13 @@ async def delete_profile(user_id: int, session: AsyncSession) -> None:
     await session.execute(
         delete(hidden_teachers).where(hidden_teachers.c.teacher_id == user_id)
     )
-    await session.execute(
-        delete(Token).where(Token.user_id == user_id)
-    )
+    await token_store.delete_user_tokens(user_id, session)
+    await revoke_user_sessions(user_id, session)
+    await bump_profile_version(Teacher, user_id, session)
     await session.execute(
         update(Match).where(Match.teacher_id == user_id).values(status=MatchStatus.ARCHIVED)
     )
 
     await session.commit()
+    await user_identity_cache.invalidate(user_id)
+    await bump_audience_version()